@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import sys
+import time
+
+from crossword import *
+from generate import CrosswordCreator, save_image
+
+PROCESSES = multiprocessing.cpu_count()
+RENDER_PROCESSES = 1
+TIMEOUT = 60
+
+# Vocabulary shared by every solver worker, set once per process
+vocabulary = None
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [4, 5]:
+        sys.exit(
+            "Usage: python batch.py structures words output_directory [images]"
+        )
+
+    # Parse command-line arguments
+    structures = sys.argv[1]
+    words = sys.argv[2]
+    output = sys.argv[3]
+    images = len(sys.argv) == 5 and sys.argv[4] == "images"
+
+    # Load and index the dictionary once for the whole batch
+    structure_files = sorted(
+        os.path.join(structures, filename)
+        for filename in os.listdir(structures)
+        if filename.endswith(".txt")
+    )
+    start = time.monotonic()
+    results = generate_batch(
+        structure_files, load_vocabulary(words), output, images=images
+    )
+    elapsed = time.monotonic() - start
+
+    # Print summary
+    for result in results:
+        print(f"{result['structure']}: {result['status']} "
+              f"({result['time']:.3f}s)")
+    solved = sum(result["status"] == "solved" for result in results)
+    print(f"Solved {solved} of {len(results)} crosswords in {elapsed:.3f}s")
+
+
+def init_worker(shared_vocabulary):
+    """
+    Store the vocabulary for this worker process, so that it is sent to
+    each worker once rather than with every structure.
+    """
+    global vocabulary
+    vocabulary = shared_vocabulary
+
+
+def solve_structure(structure_file):
+    """
+    Solve a single structure file against the worker's vocabulary.
+
+    Return a dict describing the result; for solved crosswords it also
+    holds the `structure` grid, the `letters` grid and the `text` rendering,
+    which are all cheap to send back between processes.
+    """
+    start = time.monotonic()
+    crossword = Crossword(structure_file, vocabulary)
+    creator = CrosswordCreator(crossword)
+    assignment = creator.solve(timeout=TIMEOUT)
+
+    result = {"structure": structure_file}
+    if assignment is None:
+        result["status"] = "timeout" if creator.stats["timeout"] else "unsolvable"
+    else:
+        result["status"] = "solved"
+        result["grid"] = crossword.structure
+        result["letters"] = creator.letter_grid(assignment)
+        result["text"] = creator.text(assignment)
+    result["time"] = time.monotonic() - start
+    return result
+
+
+def generate_batch(structure_files, vocabulary, output_directory,
+                   processes=None, images=False):
+    """
+    Solve every file in `structure_files` with a shared `vocabulary` in a
+    pool of worker processes, writing a text file for each solved crossword
+    to `output_directory`.
+
+    If `images` is True, image files are also written, by a separate pool of
+    rendering processes so that drawing does not hold up solving.
+
+    Return a list of result dicts, in the order crosswords were finished.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    solver = multiprocessing.Pool(
+        processes or PROCESSES, initializer=init_worker,
+        initargs=(vocabulary,)
+    )
+    renderer = multiprocessing.Pool(RENDER_PROCESSES) if images else None
+
+    results = []
+    renders = []
+    try:
+        for result in solver.imap_unordered(solve_structure, structure_files):
+            results.append(result)
+            if result["status"] != "solved":
+                continue
+
+            name = os.path.splitext(os.path.basename(result["structure"]))[0]
+            path = os.path.join(output_directory, name)
+            with open(f"{path}.txt", "w") as f:
+                f.write(result.pop("text") + "\n")
+            grid, letters = result.pop("grid"), result.pop("letters")
+            if renderer is not None:
+                renders.append(renderer.apply_async(
+                    save_image, (grid, letters, f"{path}.png")
+                ))
+
+        solver.close()
+        solver.join()
+        if renderer is not None:
+            renderer.close()
+            for render in renders:
+                render.get()
+            renderer.join()
+    finally:
+        solver.terminate()
+        if renderer is not None:
+            renderer.terminate()
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
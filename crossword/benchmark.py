@@ -0,0 +1,260 @@
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from crossword import *
+from generate import CrosswordCreator
+
+# Grid sizes (height and width), target fractions of black squares and
+# dictionary sizes to benchmark; every combination is measured TRIALS times
+SIZES = [7, 9, 11]
+DENSITIES = [0.4, 0.5]
+DICTIONARY_SIZES = [500, 2000]
+TRIALS = 2
+TIMEOUT = 5
+
+# Shortest word placed in generated grids, as real crosswords have no
+# 2-letter words
+MIN_LENGTH = 3
+
+# Failed word placements in a row after which a generated grid is finished,
+# even if it is denser than asked for
+PLACEMENT_ATTEMPTS = 500
+
+# Solver configurations to compare
+CONFIGURATIONS = [
+    {"name": "mrv", "heuristic": CrosswordCreator.MRV,
+     "seed": None, "max_conflicts": None},
+    {"name": "dom/wdeg", "heuristic": CrosswordCreator.DOM_WDEG,
+     "seed": None, "max_conflicts": None},
+    {"name": "mrv+restarts", "heuristic": CrosswordCreator.MRV,
+     "seed": 1, "max_conflicts": 100},
+    {"name": "dom/wdeg+restarts", "heuristic": CrosswordCreator.DOM_WDEG,
+     "seed": 1, "max_conflicts": 100},
+]
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python benchmark.py words [output.json]")
+    words = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) == 3 else None
+
+    with open(words) as f:
+        source = sorted(set(f.read().upper().splitlines()) - {""})
+
+    report = run_benchmark(source)
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def generate_structure(size, density, source, rng, min_length=MIN_LENGTH,
+                       attempts=PLACEMENT_ATTEMPTS):
+    """
+    Return a random `size` by `size` crossword structure as a list of lines
+    of blacked out ("#") and open ("_") cells, and the list of words from
+    `source` that fill it, so that the structure is known to be solvable.
+
+    The grid is built by placing words of at least `min_length` letters,
+    each crossing a word already placed, until at most `density` of the
+    cells are black or `attempts` placements in a row have failed. A word
+    is only placed where its cells form exactly one new slot, so the slots
+    of the structure are exactly the placed words.
+    """
+    by_length = dict()
+    for word in source:
+        if min_length <= len(word) <= size and word.isalpha():
+            by_length.setdefault(len(word), []).append(word)
+    lengths = sorted(by_length)
+
+    letters = dict()
+    covered = {Variable.ACROSS: set(), Variable.DOWN: set()}
+    words = []
+    failures = 0
+    while (failures < attempts
+           and size ** 2 - len(letters) > density * size ** 2):
+        direction = rng.choice([Variable.ACROSS, Variable.DOWN])
+        length = rng.choice(lengths)
+        i = rng.randrange(size - (length - 1 if direction == Variable.DOWN
+                                  else 0))
+        j = rng.randrange(size - (length - 1 if direction == Variable.ACROSS
+                                  else 0))
+        cells = [
+            (i + (k if direction == Variable.DOWN else 0),
+             j + (k if direction == Variable.ACROSS else 0))
+            for k in range(length)
+        ]
+        word = None
+        if placeable(cells, direction, letters, covered, size, bool(words)):
+            candidates = [
+                candidate for candidate in by_length[length]
+                if candidate not in words and all(
+                    letters.get(cell, letter) == letter
+                    for cell, letter in zip(cells, candidate)
+                )
+            ]
+            if candidates:
+                word = rng.choice(candidates)
+        if word is None:
+            failures += 1
+            continue
+
+        failures = 0
+        words.append(word)
+        covered[direction].update(cells)
+        letters.update(zip(cells, word))
+
+    structure = [
+        "".join("_" if (i, j) in letters else "#" for j in range(size))
+        for i in range(size)
+    ]
+    return structure, sorted(words)
+
+
+def placeable(cells, direction, letters, covered, size, crossing):
+    """
+    Return True if a word can be placed on `cells` in `direction` of a
+    `size` by `size` grid whose placed `letters` map cells to letters and
+    whose `covered` cells are part of an across or down word, without
+    extending or touching another word. Unless `crossing` is False, the
+    word must cross a word already placed, and it must add a new cell.
+    """
+    di, dj = (1, 0) if direction == Variable.DOWN else (0, 1)
+    (first_i, first_j), (last_i, last_j) = cells[0], cells[-1]
+    if ((first_i - di, first_j - dj) in letters
+            or (last_i + di, last_j + dj) in letters):
+        return False
+
+    crosses = 0
+    for i, j in cells:
+        if (i, j) in covered[direction]:
+            return False
+        if (i, j) in letters:
+            crosses += 1
+        elif (i + dj, j + di) in letters or (i - dj, j - di) in letters:
+            # An open cell next to this one would form an unplanned slot
+            return False
+    if crosses == len(cells):
+        return False
+    return crosses > 0 or not crossing
+
+
+def sample_vocabulary(source, size, rng, planted=()):
+    """
+    Return a `Vocabulary` of `size` words: the `planted` words, and the
+    rest sampled from the list `source`.
+    """
+    planted = set(planted)
+    rest = sorted(set(source) - planted)
+    sample = rng.sample(rest, max(min(size - len(planted), len(rest)), 0))
+    return Vocabulary(sorted(planted) + sample)
+
+
+def run_trial(structure_file, vocabulary, configuration):
+    """
+    Solve one structure with one solver configuration and return a dict of
+    measurements: search counters, wall time and peak memory of the process.
+    """
+    crossword = Crossword(structure_file, vocabulary)
+    creator = CrosswordCreator(
+        crossword,
+        heuristic=configuration["heuristic"],
+        seed=configuration["seed"]
+    )
+    start = time.perf_counter()
+    assignment = creator.solve(
+        max_conflicts=configuration["max_conflicts"], timeout=TIMEOUT
+    )
+    elapsed = time.perf_counter() - start
+
+    if assignment is not None:
+        status = "solved"
+    elif creator.stats["timeout"]:
+        status = "timeout"
+    else:
+        status = "unsolvable"
+    return {
+        "status": status,
+        "variables": len(crossword.variables),
+        "nodes": creator.stats["nodes"],
+        "revisions": creator.stats["revisions"],
+        "backtracks": creator.stats["backtracks"],
+        "conflicts": creator.stats["conflicts"],
+        "restarts": creator.stats["restarts"],
+        "time": elapsed,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _run_trial(args):
+    return run_trial(*args)
+
+
+def run_benchmark(source, seed=0):
+    """
+    Benchmark every solver configuration on generated grids and sampled
+    dictionaries, using words from the list `source`. Each grid is built
+    from real words, which its dictionary includes, so every trial is
+    solvable.
+
+    Each trial runs in a fresh process, so that memory measurements of one
+    trial are not inflated by another. Return a JSON-serializable report.
+    """
+    rng = random.Random(seed)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        pool = multiprocessing.Pool(1, maxtasksperchild=1)
+        try:
+            for size in SIZES:
+                for density in DENSITIES:
+                    for dictionary_size in DICTIONARY_SIZES:
+                        for trial in range(TRIALS):
+                            structure, planted = generate_structure(
+                                size, density, source, rng
+                            )
+                            structure_file = os.path.join(
+                                directory, "structure.txt"
+                            )
+                            with open(structure_file, "w") as f:
+                                f.write("\n".join(structure))
+                            vocabulary = sample_vocabulary(
+                                source, dictionary_size, rng, planted
+                            )
+                            black = "".join(structure).count("#")
+
+                            for configuration in CONFIGURATIONS:
+                                measurement = pool.apply(_run_trial, ((
+                                    structure_file, vocabulary, configuration
+                                ),))
+                                results.append({
+                                    "configuration": configuration["name"],
+                                    "size": size,
+                                    "density": density,
+                                    "black_fraction": black / size ** 2,
+                                    "dictionary_size": len(vocabulary),
+                                    "trial": trial,
+                                    **measurement,
+                                })
+        finally:
+            pool.terminate()
+
+    return {
+        "seed": seed,
+        "timeout": TIMEOUT,
+        "configurations": CONFIGURATIONS,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    main()
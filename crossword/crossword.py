@@ -3,12 +3,15 @@ class Variable():
     ACROSS = "across"
     DOWN = "down"
 
+    __slots__ = ("i", "j", "direction", "length", "cells", "neighbors")
+
     def __init__(self, i, j, direction, length):
         """Create a new variable with starting point, direction, and length."""
         self.i = i
         self.j = j
         self.direction = direction
         self.length = length
+        self.neighbors = set()
         self.cells = []
         for k in range(self.length):
             self.cells.append(
@@ -19,6 +22,15 @@ class Variable():
     def __hash__(self):
         return hash((self.i, self.j, self.direction, self.length))
 
+    def __reduce__(self):
+        # Rebuild from position first, so that variables are hashable before
+        # the (possibly cyclic) neighbor sets are restored
+        return (
+            Variable,
+            (self.i, self.j, self.direction, self.length),
+            (None, {"neighbors": self.neighbors})
+        )
+
     def __eq__(self, other):
         return (
             (self.i == other.i) and
@@ -35,9 +47,44 @@ class Variable():
         return f"Variable({self.i}, {self.j}, {direction}, {self.length})"
 
 
+class Vocabulary():
+
+    def __init__(self, words):
+        """Create a vocabulary from an iterable of words, indexed by length."""
+        self.words = frozenset(word.upper() for word in words if word)
+        self.by_length = dict()
+        for word in self.words:
+            self.by_length.setdefault(len(word), set()).add(word)
+        self.by_length = {
+            length: frozenset(words)
+            for length, words in self.by_length.items()
+        }
+
+    def __len__(self):
+        return len(self.words)
+
+
+def load_vocabulary(words_file):
+    """Read a words file into a length-indexed `Vocabulary`."""
+    with open(words_file) as f:
+        return Vocabulary(f.read().splitlines())
+
+
+class Overlaps(dict):
+    """Overlap mapping that reports None for pairs of variables that do not cross."""
+
+    def __missing__(self, key):
+        return None
+
+
 class Crossword():
 
     def __init__(self, structure_file, words_file):
+        """
+        Load a crossword structure. `words_file` is either the path of a
+        words file or an already loaded `Vocabulary`, which lets many
+        crosswords share one dictionary.
+        """
 
         # Determine structure of crossword
         with open(structure_file) as f:
@@ -58,8 +105,12 @@ class Crossword():
                 self.structure.append(row)
 
         # Save vocabulary list
-        with open(words_file) as f:
-            self.words = set(f.read().upper().splitlines())
+        if isinstance(words_file, Vocabulary):
+            vocabulary = words_file
+        else:
+            vocabulary = load_vocabulary(words_file)
+        self.words = vocabulary.words
+        self.words_by_length = vocabulary.by_length
 
         # Determine variable set
         self.variables = set()
@@ -104,30 +155,35 @@ class Crossword():
                             length=length
                         ))
 
+        # Index which variables cover each cell, so that only variables
+        # actually crossing each other need to be compared
+        cell_index = dict()
+        for var in self.variables:
+            for k, cell in enumerate(var.cells):
+                cell_index.setdefault(cell, []).append((var, k))
+
         # Compute overlaps for each word
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        self.overlaps = Overlaps()
+        for covering in cell_index.values():
+            if len(covering) < 2:
+                continue
+            (v1, k1), (v2, k2) = covering
+            self.overlaps[v1, v2] = (k1, k2)
+            self.overlaps[v2, v1] = (k2, k1)
+            v1.neighbors.add(v2)
+            v2.neighbors.add(v1)
+
+        # Neighbors are fixed by the structure, so freeze them before they
+        # are handed out by `neighbors`, which looks them up by value so
+        # that any variable equal to one of ours gets the same set
+        self.neighbor_sets = dict()
+        for var in self.variables:
+            var.neighbors = frozenset(var.neighbors)
+            self.neighbor_sets[var] = var.neighbors
 
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        return self.neighbor_sets.get(var, frozenset())
@@ -1,20 +1,70 @@
+import random
 import sys
+import time
+
+from collections import Counter
 
 from crossword import *
 
 
+class SearchCutoff(Exception):
+    """Raised when a search exceeds its conflict budget and should restart."""
+
+
+class SearchTimeout(Exception):
+    """Raised when a search runs past its deadline."""
+
+
 class CrosswordCreator():
 
-    def __init__(self, crossword):
+    # Variable ordering heuristics for `select_unassigned_variable`
+    MRV = "mrv"
+    DOM_WDEG = "dom/wdeg"
+
+    # Search statistics kept in `self.stats`, with their starting values
+    STATS = {
+        "nodes": 0,
+        "revisions": 0,
+        "backtracks": 0,
+        "conflicts": 0,
+        "restarts": 0,
+        "timeout": False,
+    }
+
+    def __init__(self, crossword, heuristic=MRV, seed=None):
         """
         Create new CSP crossword generate.
+
+        If `seed` is given, ties between equally ranked variables and values
+        are broken randomly, so different seeds explore different trees.
         """
+        if heuristic not in (CrosswordCreator.MRV, CrosswordCreator.DOM_WDEG):
+            raise ValueError(f"unknown heuristic: {heuristic}")
         self.crossword = crossword
+        self.heuristic = heuristic
         self.domains = {
-            var: self.crossword.words.copy()
+            var: set(self.crossword.words_by_length.get(var.length, ()))
             for var in self.crossword.variables
         }
 
+        # Constraint weights for dom/wdeg, bumped whenever a constraint
+        # is responsible for rejecting a value during search
+        self.weights = {
+            (x, y): 1
+            for x in self.crossword.variables
+            for y in self.crossword.neighbors(x)
+        }
+
+        # Cache of (variable, position) -> (domain, size, Counter of letters
+        # at that position over the domain); an entry is only used while
+        # the variable's domain is the same set with the same size
+        self.letter_counts_cache = dict()
+
+        self.random = random.Random(seed) if seed is not None else None
+        self.max_conflicts = None
+        self.deadline = None
+        self.stats = dict(CrosswordCreator.STATS)
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -31,67 +81,64 @@ class CrosswordCreator():
                 letters[i][j] = word[k]
         return letters
 
-    def print(self, assignment):
+    def text(self, assignment):
         """
-        Print crossword assignment to the terminal.
+        Return crossword assignment as a string, one line per row.
         """
         letters = self.letter_grid(assignment)
+        rows = []
         for i in range(self.crossword.height):
+            row = ""
             for j in range(self.crossword.width):
                 if self.crossword.structure[i][j]:
-                    print(letters[i][j] or " ", end="")
+                    row += letters[i][j] or " "
                 else:
-                    print("█", end="")
-            print()
+                    row += "█"
+            rows.append(row)
+        return "\n".join(rows)
+
+    def print(self, assignment):
+        """
+        Print crossword assignment to the terminal.
+        """
+        print(self.text(assignment))
 
     def save(self, assignment, filename):
         """
         Save crossword assignment to an image file.
         """
-        from PIL import Image, ImageDraw, ImageFont
-        cell_size = 100
-        cell_border = 2
-        interior_size = cell_size - 2 * cell_border
-        letters = self.letter_grid(assignment)
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.crossword.width * cell_size,
-             self.crossword.height * cell_size),
-            "black"
+        save_image(
+            self.crossword.structure, self.letter_grid(assignment), filename
         )
-        font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 80)
-        draw = ImageDraw.Draw(img)
-
-        for i in range(self.crossword.height):
-            for j in range(self.crossword.width):
-
-                rect = [
-                    (j * cell_size + cell_border,
-                     i * cell_size + cell_border),
-                    ((j + 1) * cell_size - cell_border,
-                     (i + 1) * cell_size - cell_border)
-                ]
-                if self.crossword.structure[i][j]:
-                    draw.rectangle(rect, fill="white")
-                    if letters[i][j]:
-                        w, h = draw.textsize(letters[i][j], font=font)
-                        draw.text(
-                            (rect[0][0] + ((interior_size - w) / 2),
-                             rect[0][1] + ((interior_size - h) / 2) - 10),
-                            letters[i][j], fill="black", font=font
-                        )
 
-        img.save(filename)
-
-    def solve(self):
+    def solve(self, max_conflicts=None, restart_growth=1.5, timeout=None):
         """
         Enforce node and arc consistency, and then solve the CSP.
+
+        If `max_conflicts` is given, the search restarts from scratch each
+        time that many conflicts are hit, growing the budget by a factor of
+        `restart_growth` on every restart. If `timeout` (in seconds) expires
+        first, return None as if no solution existed; `self.stats["timeout"]`
+        records whether that happened.
         """
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.stats["timeout"] = False
         self.enforce_node_consistency()
         self.ac3()
-        return self.backtrack(dict())
+
+        while True:
+            self.max_conflicts = (
+                self.stats["conflicts"] + int(max_conflicts)
+                if max_conflicts else None
+            )
+            try:
+                return self.backtrack(dict())
+            except SearchCutoff:
+                self.stats["restarts"] += 1
+                max_conflicts *= restart_growth
+            except SearchTimeout:
+                self.stats["timeout"] = True
+                return None
 
     def enforce_node_consistency(self):  
         """
@@ -100,7 +147,7 @@ class CrosswordCreator():
          constraints; in this case, the length of the word.)
         """
         for var in self.crossword.variables: # var is variable
-            for value in self.crossword.words:
+            for value in list(self.domains[var]):
                 if len(value) != var.length:
                     self.domains[var].remove(value)
 
@@ -132,6 +179,7 @@ class CrosswordCreator():
                     break
             if possible is False: # If no possible corresponding value
                 self.domains[x].remove(word_X)
+                self.stats["revisions"] += 1
                 return True
         return False 
 
@@ -158,10 +206,10 @@ class CrosswordCreator():
             if self.revise(x, y):
                 for neighbor in self.crossword.neighbors(x):
                     arcs.append((x, neighbor))
-        if self.domains[x] == None: # Return False if one or more domains end up empty
-            return False
-        else: # Return True if arc consistency is enforced and no domains are empty
-            return True
+        for var in self.crossword.variables:
+            if not self.domains[var]: # Return False if one or more domains end up empty
+                return False
+        return True # Return True if arc consistency is enforced and no domains are empty
 
     def assignment_complete(self, assignment): 
         """
@@ -199,6 +247,21 @@ class CrosswordCreator():
         return True 
 
 
+    def letter_counts(self, var, k):
+        """
+        Return a Counter mapping each letter to the number of values in the
+        domain of `var` that have that letter at position `k`.
+        """
+        domain = self.domains[var]
+        entry = self.letter_counts_cache.get((var, k))
+        if entry is not None:
+            cached, size, counts = entry
+            if cached is domain and size == len(domain):
+                return counts
+        counts = Counter(value[k] for value in domain)
+        self.letter_counts_cache[var, k] = (domain, len(domain), counts)
+        return counts
+
     def order_domain_values(self, var, assignment):
         """
         Return a list of values in the domain of `var`, in order by
@@ -206,27 +269,30 @@ class CrosswordCreator():
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
-        values = self.domains[var]
-        neighbors = self.crossword.neighbors(var)  # set of neighboring variables
-        counts = [] # List of number of ruled out values
-        for value in values:
+        # For each unassigned neighbor, a value of `var` keeps exactly the
+        # neighbor values sharing its letter at the overlap, minus the
+        # neighbor value equal to itself (words may not repeat)
+        arcs = []
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor in assignment:
+                continue
+            i, j = self.crossword.overlaps[var, neighbor]
+            arcs.append((
+                i, j, self.domains[neighbor], self.letter_counts(neighbor, j)
+            ))
+
+        def ruled_out(value):
             count = 0
-            for neighbor in neighbors:
-                neighbor_values = self.domains[neighbor]
-                overlaps = self.crossword.overlaps[var, neighbor]
-                i, j = overlaps
-                for neighbor_value in neighbor_values:
-                    if neighbor_value not in assignment:
-                        if value[i] != neighbor_value[j]: # If a value is ruled out
-                            count += 1
-                        if value == neighbor_value:
-                            count += 1
-            counts.append((value, count))
-        counts = sorted(counts, key = lambda s: s[1]) # Sorting according to numbers of ruled out
-        sorted_value = []
-        for i in range(len(counts)):
-            sorted_value.append(counts[i][0]) 
-        return sorted_value
+            for i, j, neighbor_values, letters in arcs:
+                count += len(neighbor_values) - letters[value[i]]
+                if value in neighbor_values and value[i] == value[j]:
+                    count += 1
+            return count
+
+        values = list(self.domains[var])
+        if self.random is not None:
+            self.random.shuffle(values)
+        return sorted(values, key=ruled_out)
 
     def select_unassigned_variable(self, assignment):
         """
@@ -235,21 +301,46 @@ class CrosswordCreator():
         in its domain. If there is a tie, choose the variable with the highest
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
+
+        With the dom/wdeg heuristic, instead choose the variable with the
+        smallest ratio of remaining values to the summed weights of its
+        constraints with unassigned neighbors.
         """
-        
-        counts = []
-        for var in self.crossword.variables:
-            if var not in assignment.keys():
-                num_remaining = len(self.domains[var])
-                num_neighbors = -len(self.crossword.neighbors(var))  # Negative because we are going to choose the bigger one
-                counts.append((var, num_remaining, num_neighbors))
-        counts = sorted(counts, key = lambda s: (s[1], s[2]))  # Sort the number of remaining values first and then number of neighbors
-        # sorted(s, key = lambda x: (x[1], x[2]))
-        sorted_var = []
-        for i in range(len(counts)):
-            sorted_var.append(counts[i][0]) # Pick out the variable
-        return sorted_var[0]
-        
+        unassigned = [
+            var for var in self.crossword.variables if var not in assignment
+        ]
+        if self.random is not None:
+            self.random.shuffle(unassigned)
+
+        if self.heuristic == CrosswordCreator.DOM_WDEG:
+            def score(var):
+                weight = sum(
+                    self.weights[var, neighbor]
+                    for neighbor in self.crossword.neighbors(var)
+                    if neighbor not in assignment
+                )
+                return len(self.domains[var]) / max(weight, 1)
+            return min(unassigned, key=score)
+
+        # Negative degree because we are going to choose the bigger one
+        return min(unassigned, key=lambda var: (
+            len(self.domains[var]), -len(self.crossword.neighbors(var))
+        ))
+
+    def record_conflict(self, var, assignment):
+        """
+        Increase the weight of every constraint between `var` and an
+        assigned neighbor whose value conflicts with `assignment[var]`.
+        """
+        value = assignment[var]
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor not in assignment:
+                continue
+            i, j = self.crossword.overlaps[var, neighbor]
+            other = assignment[neighbor]
+            if value[i] != other[j] or value == other:
+                self.weights[var, neighbor] += 1
+                self.weights[neighbor, var] += 1
 
     def backtrack(self, assignment):
         """
@@ -262,21 +353,76 @@ class CrosswordCreator():
         """
         if self.assignment_complete(assignment):
             return assignment
-        
+
+        self.stats["nodes"] += 1
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SearchTimeout()
+
         var = self.select_unassigned_variable(assignment)
 
         for value in self.order_domain_values(var, assignment):
             assignment[var] = value
             if self.consistent(assignment):
                 result = self.backtrack(assignment)
-                if result is None:
-                    assignment[var] = None
-                else:
+                if result is not None:
                     return result
-
+            else:
+                self.stats["conflicts"] += 1
+                if self.heuristic == CrosswordCreator.DOM_WDEG:
+                    self.record_conflict(var, assignment)
+                if (self.max_conflicts is not None
+                        and self.stats["conflicts"] >= self.max_conflicts):
+                    raise SearchCutoff()
+            del assignment[var]
+
+        self.stats["backtracks"] += 1
         return None
 
 
+def save_image(structure, letters, filename):
+    """
+    Save a letter grid to an image file, drawing the cells that are True
+    in `structure` white and filled in with the corresponding letters.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    cell_size = 100
+    cell_border = 2
+    interior_size = cell_size - 2 * cell_border
+    height = len(structure)
+    width = len(structure[0]) if structure else 0
+
+    # Create a blank canvas
+    img = Image.new(
+        "RGBA",
+        (width * cell_size,
+         height * cell_size),
+        "black"
+    )
+    font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 80)
+    draw = ImageDraw.Draw(img)
+
+    for i in range(height):
+        for j in range(width):
+
+            rect = [
+                (j * cell_size + cell_border,
+                 i * cell_size + cell_border),
+                ((j + 1) * cell_size - cell_border,
+                 (i + 1) * cell_size - cell_border)
+            ]
+            if structure[i][j]:
+                draw.rectangle(rect, fill="white")
+                if letters[i][j]:
+                    w, h = draw.textsize(letters[i][j], font=font)
+                    draw.text(
+                        (rect[0][0] + ((interior_size - w) / 2),
+                         rect[0][1] + ((interior_size - h) / 2) - 10),
+                        letters[i][j], fill="black", font=font
+                    )
+
+    img.save(filename)
+
+
 def main():
 
     # Check usage
@@ -0,0 +1,168 @@
+import multiprocessing
+import sys
+import time
+
+from crossword import *
+from generate import CrosswordCreator
+
+PROCESSES = multiprocessing.cpu_count()
+TIMEOUT = 60
+RESTART_CONFLICTS = 100
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python portfolio.py structure words [output]")
+
+    # Parse command-line arguments
+    structure = sys.argv[1]
+    words = sys.argv[2]
+    output = sys.argv[3] if len(sys.argv) == 4 else None
+
+    # Race a portfolio of searches against each other
+    crossword = Crossword(structure, words)
+    assignment, results = solve_portfolio(crossword, timeout=TIMEOUT)
+
+    # Print per-strategy statistics
+    for result in results:
+        if result["status"] == "cancelled":
+            print(f"{result['name']:<24} {result['status']}")
+            continue
+        print(
+            f"{result['name']:<24} {result['status']:<10} "
+            f"{result['time']:8.3f}s  nodes={result['nodes']} "
+            f"conflicts={result['conflicts']} restarts={result['restarts']}"
+        )
+    print()
+
+    # Print result
+    creator = CrosswordCreator(crossword)
+    if assignment is None:
+        print("No solution.")
+    else:
+        creator.print(assignment)
+        if output:
+            creator.save(assignment, output)
+
+
+def default_strategies(n):
+    """
+    Return a list of `n` search strategies for a portfolio.
+
+    Each strategy is a dict with a `name`, a `heuristic` for
+    `CrosswordCreator`, a random `seed` (or None for deterministic
+    tie-breaking) and a `max_conflicts` restart cutoff (or None for a
+    single complete search). The first strategy is always the plain
+    deterministic MRV search; the rest alternate heuristics with
+    different seeds and restarts.
+    """
+    strategies = [{
+        "name": "mrv",
+        "heuristic": CrosswordCreator.MRV,
+        "seed": None,
+        "max_conflicts": None,
+    }]
+    heuristics = [CrosswordCreator.DOM_WDEG, CrosswordCreator.MRV]
+    for seed in range(1, n):
+        heuristic = heuristics[seed % len(heuristics)]
+        strategies.append({
+            "name": f"{heuristic}+restarts#{seed}",
+            "heuristic": heuristic,
+            "seed": seed,
+            "max_conflicts": RESTART_CONFLICTS,
+        })
+    return strategies
+
+
+def run_strategy(crossword, strategy, timeout=None):
+    """
+    Solve `crossword` with a single `strategy`.
+
+    Return a tuple `(assignment, result)`, where `result` is a dict of
+    statistics about the search whose `status` is "solved", "unsolvable"
+    or "timeout".
+    """
+    start = time.monotonic()
+    creator = CrosswordCreator(
+        crossword, heuristic=strategy["heuristic"], seed=strategy["seed"]
+    )
+    assignment = creator.solve(
+        max_conflicts=strategy["max_conflicts"], timeout=timeout
+    )
+    if assignment is not None:
+        status = "solved"
+    elif creator.stats["timeout"]:
+        status = "timeout"
+    else:
+        status = "unsolvable"
+
+    result = dict(strategy)
+    result.update(creator.stats)
+    result["status"] = status
+    result["time"] = time.monotonic() - start
+    return assignment, result
+
+
+def _run_strategy(args):
+    index, crossword, strategy, timeout = args
+    return (index,) + run_strategy(crossword, strategy, timeout)
+
+
+def solve_portfolio(crossword, strategies=None, processes=None, timeout=None):
+    """
+    Solve `crossword` by running several strategies in worker processes.
+
+    The first strategy to finish with a definitive answer (a solution, or
+    a proof that none exists) wins and the remaining workers are stopped.
+    If `timeout` seconds pass with no definitive answer, give up.
+
+    Return a tuple `(assignment, results)`. `assignment` maps the variables
+    of `crossword` to words, or is None. `results` holds one statistics dict
+    per strategy, in the order given; strategies that were stopped before
+    finishing have status "cancelled".
+    """
+    processes = processes or PROCESSES
+    if strategies is None:
+        strategies = default_strategies(processes)
+
+    results = [
+        dict(strategy, **dict.fromkeys(CrosswordCreator.STATS),
+             status="cancelled", time=None)
+        for strategy in strategies
+    ]
+    assignment = None
+
+    deadline = time.monotonic() + timeout if timeout else None
+    tasks = [
+        (index, crossword, strategy, timeout)
+        for index, strategy in enumerate(strategies)
+    ]
+    pool = multiprocessing.Pool(min(processes, len(strategies)))
+    try:
+        finished = pool.imap_unordered(_run_strategy, tasks)
+        for _ in strategies:
+            remaining = (
+                max(deadline - time.monotonic(), 0) if deadline else None
+            )
+            try:
+                index, found, result = finished.next(timeout=remaining)
+            except multiprocessing.TimeoutError:
+                break
+            results[index] = result
+            if result["status"] != "timeout":
+                assignment = found
+                break
+    finally:
+        pool.terminate()
+        pool.join()
+
+    # Return the assignment in terms of the caller's own variables
+    if assignment is not None:
+        assignment = {var: assignment[var] for var in crossword.variables}
+    return assignment, results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+
+from generator import generate_puzzle
+from logic import *
+
+# Numbers of speakers to benchmark, and puzzles generated for each
+SPEAKERS = [2, 3, 4, 6, 8, 12, 16]
+PUZZLES = 8
+STATEMENTS = 1
+DEPTH = 2
+
+# Largest number of symbols each backend is run on; the exhaustive
+# backends take time exponential in the number of symbols
+SYMBOL_LIMITS = {
+    "enumerate": 12,
+    "bitwise": 24,
+    "sat": None,
+    "sat-batch": None,
+}
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [output.json]")
+    output = sys.argv[1] if len(sys.argv) == 2 else None
+
+    results = run_benchmark()
+
+    # Print mean solve time for each number of speakers and backend
+    print(f"{'speakers':>8} {'backend':>10} {'puzzles':>8} "
+          f"{'mean time':>10} {'models':>8}")
+    for n in SPEAKERS:
+        for backend in SYMBOL_LIMITS:
+            rows = [
+                result for result in results
+                if result["speakers"] == n and result["backend"] == backend
+            ]
+            if not rows:
+                continue
+            mean = statistics.mean(row["time"] for row in rows)
+            counts = [row["models"] for row in rows if row["models"] is not None]
+            models = f"{statistics.mean(counts):.1f}" if counts else "-"
+            print(f"{n:>8} {backend:>10} {len(rows):>8} "
+                  f"{mean:>9.4f}s {models:>8}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def count_models(knowledge, symbols):
+    """Return the number of models over `symbols` in which knowledge holds."""
+    program = Program([knowledge], [symbol.name for symbol in symbols])
+    return sum(bin(block[0]).count("1") for block in program.blocks())
+
+
+def solve(knowledge, symbols, backend):
+    """
+    Return the set of `symbols` entailed by knowledge using `backend`,
+    which is a `model_check` backend name or "sat-batch" for a single
+    compiled `KnowledgeBase`.
+    """
+    if backend == "sat-batch":
+        statuses = KnowledgeBase(knowledge).statuses(symbols)
+        return {
+            symbol for symbol in symbols
+            if statuses[symbol] == KnowledgeBase.ENTAILED
+        }
+    return {
+        symbol for symbol in symbols
+        if model_check(knowledge, symbol, backend=backend)
+    }
+
+
+def run_puzzle(n, seed):
+    """
+    Generate the puzzle with `n` speakers for `seed` and solve it with
+    every backend within its symbol limit. Return a list of result dicts.
+    """
+    symbols, knowledge, said = generate_puzzle(
+        n, statements=STATEMENTS, depth=DEPTH, seed=seed
+    )
+    models = (
+        count_models(knowledge, symbols)
+        if len(symbols) <= SYMBOL_LIMITS["bitwise"] else None
+    )
+
+    results = []
+    answers = dict()
+    for backend, limit in SYMBOL_LIMITS.items():
+        if limit is not None and len(symbols) > limit:
+            continue
+        start = time.perf_counter()
+        answers[backend] = solve(knowledge, symbols, backend)
+        results.append({
+            "speakers": n,
+            "seed": seed,
+            "backend": backend,
+            "symbols": len(symbols),
+            "models": models,
+            "entailed": len(answers[backend]),
+            "time": time.perf_counter() - start,
+        })
+
+    # Every backend must agree on what the puzzle entails
+    if len(set(map(frozenset, answers.values()))) > 1:
+        raise Exception(f"backends disagree on puzzle {n}/{seed}")
+    return results
+
+
+def _run_puzzle(args):
+    return run_puzzle(*args)
+
+
+def run_benchmark(processes=None):
+    """
+    Solve PUZZLES generated puzzles for each number of SPEAKERS in a pool
+    of worker processes, and return a flat list of result dicts.
+    """
+    tasks = [(n, seed) for n in SPEAKERS for seed in range(PUZZLES)]
+    with multiprocessing.Pool(processes) as pool:
+        return [
+            result
+            for results in pool.imap(_run_puzzle, tasks)
+            for result in results
+        ]
+
+
+if __name__ == "__main__":
+    main()
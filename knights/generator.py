@@ -0,0 +1,63 @@
+import random
+
+from logic import *
+
+
+def generate_puzzle(n, statements=1, depth=2, seed=None):
+    """
+    Generate a random knights and knaves puzzle with `n` speakers.
+
+    Every speaker makes `statements` random statements about the kinds of
+    the speakers, nested up to `depth` connectives deep; some statements
+    are about what another speaker would say.
+
+    Return a tuple `(symbols, knowledge, said)`, where `symbols` lists the
+    knight and knave symbol of each speaker, `knowledge` encodes the rules
+    and every statement, and `said` is a list of `(speaker, statement)`
+    pairs.
+    """
+    rng = random.Random(seed)
+    names = [speaker_name(i) for i in range(n)]
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+
+    def statement(level):
+        """Return a random statement nested up to `level` deep."""
+        i = rng.randrange(n)
+        if level == 0 or rng.random() < 0.25:
+            return knights[i] if rng.random() < 0.5 else knaves[i]
+        kind = rng.randrange(6)
+        if kind == 0:
+            return Not(statement(level - 1))
+        if kind == 1:
+            return And(statement(level - 1), statement(level - 1))
+        if kind == 2:
+            return Or(statement(level - 1), statement(level - 1))
+        if kind == 3:
+            return Implication(statement(level - 1), statement(level - 1))
+        if kind == 4:
+            return Biconditional(statement(level - 1), statement(level - 1))
+
+        # Speaker i would say the statement: true exactly when i is a knight
+        # and the statement holds, or i is a knave and it does not
+        return Biconditional(knights[i], statement(level - 1))
+
+    rules = []
+    said = []
+    for i in range(n):
+        rules.append(Or(knights[i], knaves[i]))
+        rules.append(Not(And(knights[i], knaves[i])))
+        for _ in range(statements):
+            s = statement(depth)
+            said.append((names[i], s))
+            rules.append(Implication(knights[i], s))
+            rules.append(Implication(knaves[i], Not(s)))
+
+    symbols = [symbol for pair in zip(knights, knaves) for symbol in pair]
+    return symbols, And(*rules), said
+
+
+def speaker_name(i):
+    """Return a name for speaker `i`: A to Z, then A1 to Z1, and so on."""
+    letter = chr(ord("A") + i % 26)
+    return letter if i < 26 else f"{letter}{i // 26}"
@@ -1,7 +1,55 @@
 import itertools
+import weakref
+
+from sat import Solver
 
 
 class Sentence():
+    """
+    Base class of logical sentences.
+
+    Sentences are immutable and hash-consed: constructing a sentence equal
+    to one that already exists returns the existing node, so equal
+    subsentences are shared, and each node computes its hash and its set
+    of symbols only once.
+    """
+
+    __slots__ = ("_args", "_hash", "_symbols", "__weakref__")
+
+    # Live sentences, keyed by class and constructor arguments
+    _interned = weakref.WeakValueDictionary()
+
+    @classmethod
+    def intern(cls, args, symbols):
+        """
+        Returns the sentence of this class built from `args`, creating it
+        with the given set of `symbols` if it does not exist yet.
+        """
+        key = (cls, args)
+        sentence = Sentence._interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            object.__setattr__(sentence, "_args", args)
+            object.__setattr__(sentence, "_hash", hash((cls.__name__, args)))
+            object.__setattr__(sentence, "_symbols", frozenset(symbols))
+            Sentence._interned[key] = sentence
+        return sentence
+
+    def __setattr__(self, name, value):
+        raise AttributeError("logical sentences are immutable")
+
+    def __eq__(self, other):
+        return self is other or (
+            type(self) is type(other)
+            and self._hash == other._hash
+            and self._args == other._args
+        )
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), self._args)
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -12,8 +60,12 @@ class Sentence():
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """
+        Returns a set of all symbols in the logical sentence. The set is
+        computed once per sentence and is a frozenset, so callers that need
+        to modify it must copy it.
+        """
+        return self._symbols
 
     @classmethod
     def validate(cls, sentence):
@@ -44,14 +96,14 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ()
 
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def __new__(cls, name):
+        return cls.intern((name,), (name,))
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    @property
+    def name(self):
+        return self._args[0]
 
     def __repr__(self):
         return self.name
@@ -65,20 +117,18 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
-
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+    __slots__ = ()
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern((operand,), operand.symbols())
+
+    @property
+    def operand(self):
+        return self._args[0]
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +139,21 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
-
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+
+    __slots__ = ()
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        return cls.intern(conjuncts, frozenset().union(
+            *[conjunct.symbols() for conjunct in conjuncts]
+        ))
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    @property
+    def conjuncts(self):
+        return self._args
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +162,10 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        raise TypeError(
+            "logical sentences are immutable; use KnowledgeBase.add, "
+            "or And(knowledge, conjunct), to extend a conjunction"
+        )
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +176,21 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
-
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+
+    __slots__ = ()
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return cls.intern(disjuncts, frozenset().union(
+            *[disjunct.symbols() for disjunct in disjuncts]
+        ))
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    @property
+    def disjuncts(self):
+        return self._args
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +205,26 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
-
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+
+    __slots__ = ()
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return cls.intern(
+            (antecedent, consequent),
+            antecedent.symbols() | consequent.symbols()
+        )
 
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+    @property
+    def antecedent(self):
+        return self._args[0]
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    @property
+    def consequent(self):
+        return self._args[1]
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +238,23 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
-
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+
+    __slots__ = ()
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return cls.intern((left, right), left.symbols() | right.symbols())
 
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+    @property
+    def left(self):
+        return self._args[0]
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    @property
+    def right(self):
+        return self._args[1]
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,12 +270,81 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
 
+class Encoder():
+    """
+    Tseitin-encodes sentences into clauses of a `sat.Solver`.
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    Every symbol gets a solver variable, and every compound subsentence
+    gets a fresh variable constrained to be equivalent to it, so the
+    clauses grow linearly with the size of the sentences.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver if solver is not None else Solver()
+        self.variables = dict()
+        self.literals = dict()
+
+    def variable(self, name):
+        """Returns the solver variable for the symbol called `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_var()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Asserts that `sentence` is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when `sentence` is."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        clause = self.solver.add_clause
+        if isinstance(sentence, And):
+            operands = [self.literal(c) for c in sentence.conjuncts]
+            a = self.solver.new_var()
+            for operand in operands:
+                clause([-a, operand])
+            clause([a] + [-operand for operand in operands])
+        elif isinstance(sentence, Or):
+            operands = [self.literal(d) for d in sentence.disjuncts]
+            a = self.solver.new_var()
+            for operand in operands:
+                clause([a, -operand])
+            clause([-a] + operands)
+        elif isinstance(sentence, Implication):
+            p = self.literal(sentence.antecedent)
+            q = self.literal(sentence.consequent)
+            a = self.solver.new_var()
+            clause([-a, -p, q])
+            clause([a, p])
+            clause([a, -q])
+        elif isinstance(sentence, Biconditional):
+            p = self.literal(sentence.left)
+            q = self.literal(sentence.right)
+            a = self.solver.new_var()
+            clause([-a, -p, q])
+            clause([-a, p, -q])
+            clause([a, p, q])
+            clause([a, -p, -q])
+        else:
+            raise TypeError(f"cannot encode {sentence!r}")
+
+        self.literals[sentence] = a
+        return a
+
+
+def enumeration_check(knowledge, query):
+    """Checks if knowledge base entails query by enumerating all models."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +375,231 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking with a SAT solver
+    that knowledge base and not query cannot both be true.
+    """
+    encoder = Encoder()
+    encoder.add(knowledge)
+    encoder.add(Not(query))
+    return not encoder.solver.solve()
+
+
+class Program():
+    """
+    Sentences compiled to a flat list of bitwise instructions over symbol
+    indices, which evaluate many models at once.
+
+    A block of models is evaluated with one integer per symbol, whose bit m
+    holds that symbol's value in model m, so each instruction computes a
+    subsentence for the whole block in a single integer operation.
+    """
+
+    # Number of symbols enumerated within a single block of 2 ** n models
+    BLOCK_BITS = 16
+
+    def __init__(self, sentences, symbols=None):
+        """
+        Compiles `sentences` over the symbol names in `symbols` (by default,
+        the sorted names of all their symbols).
+        """
+        if symbols is None:
+            symbols = sorted(set().union(
+                *[sentence.symbols() for sentence in sentences]
+            ))
+        self.symbols = list(symbols)
+        self.indices = {name: i for i, name in enumerate(self.symbols)}
+        self.instructions = []
+        self.registers = dict()
+        self.outputs = [self.compile(sentence) for sentence in sentences]
+
+    def compile(self, sentence):
+        """Emits instructions for `sentence`, returning its register."""
+        if sentence in self.registers:
+            return self.registers[sentence]
+
+        if isinstance(sentence, Symbol):
+            instruction = ("symbol", self.indices[sentence.name])
+        elif isinstance(sentence, Not):
+            instruction = ("not", self.compile(sentence.operand))
+        elif isinstance(sentence, And):
+            instruction = ("and", tuple(
+                self.compile(conjunct) for conjunct in sentence.conjuncts
+            ))
+        elif isinstance(sentence, Or):
+            instruction = ("or", tuple(
+                self.compile(disjunct) for disjunct in sentence.disjuncts
+            ))
+        elif isinstance(sentence, Implication):
+            instruction = ("implies",
+                           self.compile(sentence.antecedent),
+                           self.compile(sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            instruction = ("biconditional",
+                           self.compile(sentence.left),
+                           self.compile(sentence.right))
+        else:
+            raise TypeError(f"cannot compile {sentence!r}")
+
+        self.instructions.append(instruction)
+        register = len(self.instructions) - 1
+        self.registers[sentence] = register
+        return register
+
+    def run(self, columns, mask):
+        """
+        Evaluates the program on a block of models, where `columns[i]` is
+        the bit pattern of symbol i and `mask` has a bit set for each model.
+        Returns the bit pattern of each compiled sentence.
+        """
+        values = []
+        for instruction in self.instructions:
+            op = instruction[0]
+            if op == "symbol":
+                value = columns[instruction[1]]
+            elif op == "not":
+                value = values[instruction[1]] ^ mask
+            elif op == "and":
+                value = mask
+                for register in instruction[1]:
+                    value &= values[register]
+            elif op == "or":
+                value = 0
+                for register in instruction[1]:
+                    value |= values[register]
+            elif op == "implies":
+                value = (values[instruction[1]] ^ mask) | values[instruction[2]]
+            else:
+                value = (values[instruction[1]] ^ values[instruction[2]]) ^ mask
+            values.append(value)
+        return [values[register] for register in self.outputs]
+
+    def evaluate(self, model):
+        """Evaluates each compiled sentence in a single model."""
+        columns = [int(bool(model[name])) for name in self.symbols]
+        return [bool(value) for value in self.run(columns, 1)]
+
+    def blocks(self):
+        """
+        Yields the output bit patterns for every model of the symbols,
+        one block of up to 2 ** BLOCK_BITS models at a time.
+        """
+        n = len(self.symbols)
+        low = min(n, Program.BLOCK_BITS)
+        width = 1 << low
+        mask = (1 << width) - 1
+
+        # Symbol k below `low` alternates runs of 2 ** k false and true
+        # models; repeat that period across the block
+        patterns = []
+        for k in range(low):
+            run = 1 << k
+            period = ((1 << run) - 1) << run
+            patterns.append(period * (mask // ((1 << (2 * run)) - 1)))
+
+        # Remaining symbols are constant within each block
+        for block in range(1 << (n - low)):
+            columns = patterns + [
+                mask if (block >> k) & 1 else 0 for k in range(n - low)
+            ]
+            yield self.run(columns, mask)
+
+
+class KnowledgeBase():
+    """
+    A knowledge base compiled once into a SAT solver, so that many queries
+    can be answered against it without re-encoding it.
+
+    Unlike sentences, a knowledge base is mutable: `add` asserts another
+    sentence, which is encoded into the same solver.
+    """
+
+    ENTAILED = "entailed"
+    REFUTED = "refuted"
+    UNKNOWN = "unknown"
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.encoder = Encoder()
+        for sentence in sentences:
+            self.add(sentence)
+
+    @property
+    def knowledge(self):
+        """Returns the conjunction of every sentence added so far."""
+        return And(*self.sentences)
+
+    def add(self, sentence):
+        """Asserts that `sentence` is true."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.encoder.add(sentence)
+
+    def status(self, query):
+        """
+        Returns ENTAILED if the knowledge base entails query, REFUTED if it
+        entails the negation of query, and UNKNOWN otherwise.
+        """
+        return self.statuses([query])[query]
+
+    def statuses(self, queries):
+        """Returns a dict mapping each of queries to its status."""
+        solver = self.encoder.solver
+        literals = {query: self.encoder.literal(query) for query in queries}
+
+        # Each satisfying model found along the way shows, for every query
+        # at once, a polarity the knowledge base does not rule out
+        possible = {query: set() for query in queries}
+
+        def record(model):
+            for query, literal in literals.items():
+                possible[query].add(model[abs(literal)] == (literal > 0))
+
+        statuses = dict()
+        for query, literal in literals.items():
+            if False not in possible[query]:
+                if solver.solve([-literal]):
+                    record(solver.model)
+                else:
+                    statuses[query] = KnowledgeBase.ENTAILED
+                    continue
+            if True not in possible[query]:
+                if solver.solve([literal]):
+                    record(solver.model)
+                else:
+                    statuses[query] = KnowledgeBase.REFUTED
+                    continue
+            statuses[query] = KnowledgeBase.UNKNOWN
+        return statuses
+
+
+def bitwise_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by evaluating a compiled
+    program on whole blocks of models at once.
+    """
+    program = Program([knowledge, query])
+    for knowledge_true, query_true in program.blocks():
+        if knowledge_true & ~query_true:
+            return False
+    return True
+
+
+# Entailment checkers available to `model_check`, by name
+BACKENDS = {
+    "enumerate": enumeration_check,
+    "bitwise": bitwise_check,
+    "sat": sat_check,
+}
+
+
+def model_check(knowledge, query, backend="sat"):
+    """Checks if knowledge base entails query."""
+    return BACKENDS[backend](knowledge, query)
@@ -115,8 +115,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            statuses = KnowledgeBase(knowledge).statuses(symbols)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if statuses[symbol] == KnowledgeBase.ENTAILED:
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,302 @@
+import heapq
+
+
+class Solver():
+    """
+    A CDCL satisfiability solver over clauses in DIMACS-style form: each
+    clause is a list of non-zero integers, where `n` is variable n and `-n`
+    is its negation.
+
+    Unit propagation uses two watched literals per clause, and every
+    conflict is analysed down to its first unique implication point to learn
+    a new clause and backjump. Learned clauses are kept between calls to
+    `solve`, so the solver can be queried repeatedly under different
+    assumptions.
+    """
+
+    RESTART_INTERVAL = 100
+    RESTART_GROWTH = 1.5
+    ACTIVITY_DECAY = 0.95
+
+    def __init__(self):
+        self.num_vars = 0
+        self.ok = True
+
+        # Per-variable state, indexed by variable number (index 0 unused)
+        self.values = [0]     # 1 if true, -1 if false, 0 if unassigned
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+
+        # Clauses watching each literal
+        self.watches = dict()
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+
+        self.order = []
+        self.activity_inc = 1.0
+        self.model = None
+        self.stats = {"decisions": 0, "propagations": 0, "conflicts": 0}
+
+    def new_var(self):
+        """Add a variable to the solver and return its number."""
+        self.num_vars += 1
+        var = self.num_vars
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        self.watches[var] = []
+        self.watches[-var] = []
+        heapq.heappush(self.order, (0.0, var))
+        return var
+
+    def value(self, lit):
+        """Return 1 if `lit` is true, -1 if false and 0 if unassigned."""
+        value = self.values[abs(lit)]
+        return value if lit > 0 else -value
+
+    def add_clause(self, lits):
+        """
+        Add a clause to the solver. Return False if the clauses are now
+        known to be unsatisfiable, True otherwise.
+        """
+        if not self.ok:
+            return False
+
+        # Only level 0 assignments exist between calls to `solve`, so
+        # literals they falsify can be dropped for good
+        clause = []
+        for lit in lits:
+            value = self.value(lit)
+            if value == 1 or -lit in clause:
+                return True
+            if value == 0 and lit not in clause:
+                clause.append(lit)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+        return self.ok
+
+    def enqueue(self, lit, reason):
+        """Assign `lit` true at the current decision level."""
+        var = abs(lit)
+        self.values[var] = 1 if lit > 0 else -1
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        """
+        Propagate all enqueued assignments. Return a conflicting clause if
+        one is found, or None otherwise.
+        """
+        values = self.values
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            self.stats["propagations"] += 1
+
+            watchers = self.watches[false_lit]
+            kept = []
+            i = 0
+            while i < len(watchers):
+                clause = watchers[i]
+                i += 1
+
+                # Keep the falsified watch in the second position
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                first_value = values[abs(first)]
+                if first < 0:
+                    first_value = -first_value
+                if first_value == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    value = values[abs(lit)]
+                    if (value if lit > 0 else -value) != -1:
+                        clause[1], clause[k] = lit, false_lit
+                        self.watches[lit].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value == -1:
+                        kept.extend(watchers[i:])
+                        self.watches[false_lit] = kept
+                        self.qhead = len(self.trail)
+                        return clause
+                    self.enqueue(first, clause)
+
+            self.watches[false_lit] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derive a learned clause from `conflict` by resolving back to the
+        first unique implication point. Return the clause, with its
+        asserting literal first, and the level to backjump to.
+        """
+        level = len(self.trail_lim)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = conflict
+
+        while True:
+            for q in clause:
+                if q == lit:
+                    continue
+                var = abs(q)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.levels[var] == level:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+
+            # Walk back along the trail to the next literal to resolve on
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(lit)]
+
+        learnt[0] = -lit
+
+        # Backjump to the second highest level in the clause, and watch the
+        # literal from that level
+        backjump = 0
+        for k in range(1, len(learnt)):
+            if self.levels[abs(learnt[k])] > backjump:
+                backjump = self.levels[abs(learnt[k])]
+                learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, backjump
+
+    def bump(self, var):
+        """Increase the branching activity of `var`."""
+        self.activity[var] += self.activity_inc
+        rescaled = self.activity[var] > 1e100
+        if rescaled:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.activity_inc *= 1e-100
+
+        # The order heap holds stale entries too; rebuild it when it
+        # has grown too large or its activities have been rescaled
+        if rescaled or len(self.order) > 10 * self.num_vars:
+            self.order = [
+                (-self.activity[v], v) for v in range(1, self.num_vars + 1)
+            ]
+            heapq.heapify(self.order)
+        else:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def cancel_until(self, level):
+        """Undo all assignments above decision `level`."""
+        if len(self.trail_lim) <= level:
+            return
+        for lit in self.trail[self.trail_lim[level]:]:
+            var = abs(lit)
+            self.phases[var] = lit > 0
+            self.values[var] = 0
+            self.reasons[var] = None
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch(self):
+        """Return the unassigned variable with the highest activity."""
+        while self.order:
+            activity, var = heapq.heappop(self.order)
+            if self.values[var] == 0 and -activity == self.activity[var]:
+                return var
+        for var in range(1, self.num_vars + 1):
+            if self.values[var] == 0:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Return True if the clauses are satisfiable with every literal in
+        `assumptions` true, and False otherwise. On success, `self.model`
+        maps each variable to its value in a satisfying assignment.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+
+        restart_limit = Solver.RESTART_INTERVAL
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+
+                learnt, backjump = self.analyze(conflict)
+                self.cancel_until(backjump)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.watches[learnt[0]].append(learnt)
+                    self.watches[learnt[1]].append(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.activity_inc /= Solver.ACTIVITY_DECAY
+                continue
+
+            # Restart now and then, keeping learned clauses and activities
+            if conflicts >= restart_limit:
+                conflicts = 0
+                restart_limit *= Solver.RESTART_GROWTH
+                self.cancel_until(0)
+                continue
+
+            # Decide assumptions first, one per decision level
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                lit = assumptions[level]
+                value = self.value(lit)
+                if value == -1:
+                    self.cancel_until(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value == 0:
+                    self.enqueue(lit, None)
+                continue
+
+            var = self.pick_branch()
+            if var is None:
+                self.model = {
+                    var: self.values[var] == 1
+                    for var in range(1, self.num_vars + 1)
+                }
+                self.cancel_until(0)
+                return True
+            self.stats["decisions"] += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(var if self.phases[var] else -var, None)
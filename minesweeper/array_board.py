@@ -0,0 +1,97 @@
+import numpy as np
+
+from minesweeper import Minesweeper
+
+
+class ArrayMinesweeper(Minesweeper):
+    """
+    Minesweeper game representation backed by NumPy arrays, for
+    simulating many or large games quickly.
+
+    Mines are placed in a single draw, and the number of nearby mines of
+    every cell is computed up front, so `nearby_mines` is a lookup.
+    """
+
+    def __init__(self, height=8, width=8, mines=8, seed=None):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+
+        # Place all mines at once by sampling distinct cell indices
+        rng = np.random.default_rng(seed)
+        positions = rng.choice(height * width, size=mines, replace=False)
+        self.board = np.zeros(height * width, dtype=bool)
+        self.board[positions] = True
+        self.board = self.board.reshape(height, width)
+        self.mines = {
+            (int(position) // width, int(position) % width)
+            for position in positions
+        }
+
+        # Count nearby mines for every cell: a 3x3 convolution of the board,
+        # minus the cell itself
+        self.counts = neighborhood_sum(self.board.astype(np.uint8))
+        self.counts -= self.board
+
+        # At first, player has found no mines and revealed no cells
+        self.mines_found = set()
+        self.revealed = np.zeros((height, width), dtype=bool)
+
+    def is_mine(self, cell):
+        i, j = cell
+        return bool(self.board[i, j])
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def reveal(self, cell):
+        """
+        Reveals a safe cell, and if it has no nearby mines, the whole region
+        around it that a player would open by hand: every cell reachable
+        through cells with no nearby mines.
+
+        Returns a list of (cell, nearby mines) pairs for the newly revealed
+        cells, starting with `cell` itself.
+        """
+        i, j = cell
+        region = np.zeros((self.height, self.width), dtype=bool)
+        region[i, j] = True
+
+        # Grow the region from its zero-count cells until it stops changing
+        if self.counts[i, j] == 0:
+            zeros = (self.counts == 0) & ~self.board
+            while True:
+                grown = (neighborhood_sum(region & zeros) > 0) & ~self.board
+                grown |= region
+                if np.array_equal(grown, region):
+                    break
+                region = grown
+
+        region &= ~self.revealed
+        self.revealed |= region
+        revealed = [(cell, self.nearby_mines(cell))] if region[i, j] else []
+        region[i, j] = False
+        for ni, nj in np.argwhere(region):
+            revealed.append(((int(ni), int(nj)), int(self.counts[ni, nj])))
+        return revealed
+
+
+def neighborhood_sum(grid):
+    """
+    Returns an array where each cell holds the sum of `grid` over the 3x3
+    block centred on it, treating cells off the board as zero.
+    """
+    padded = np.pad(grid.astype(np.int16), 1)
+    height, width = grid.shape
+    total = np.zeros((height, width), dtype=np.int16)
+    for di in range(3):
+        for dj in range(3):
+            total += padded[di:di + height, dj:dj + width]
+    return total
@@ -1,6 +1,8 @@
 import itertools
 import random
 
+from probability import mine_probabilities
+
 
 class Minesweeper():
     """
@@ -147,12 +149,18 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known
+        self.total_mines = mines
+
+        # Component results kept between guesses, see `mine_probabilities`
+        self.probability_cache = dict()
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -160,26 +168,36 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells that have not been clicked on yet
+        self.safe_moves = set()
+
+        # Sentences about the game known to be true, keyed by their
+        # cells and count, and the keys of the sentences mentioning each cell
+        self.knowledge = dict()
+        self.index = dict()
+
+        # Work left for inference: cells concluded to be mines or safe that
+        # still have to be removed from sentences, and keys of new
+        # sentences not yet compared against the sentences they overlap
+        self.pending_mines = []
+        self.pending_safes = []
+        self.pending_sentences = []
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.pending_mines.append(cell)
+        self.infer()
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.pending_safes.append(cell)
+        self.infer()
 
     def add_knowledge(self, cell, count):
         """
@@ -198,10 +216,12 @@ class MinesweeperAI():
         """
         # 1
         self.moves_made.add(cell)
-        
+        self.safe_moves.discard(cell)
+
         # 2
-        self.mark_safe(cell)
-        
+        self.pending_safes.append(cell)
+        self.infer()
+
         # 3
         cells = []
         for i in range(cell[0] - 1, cell[0] + 1 + 1):
@@ -215,40 +235,95 @@ class MinesweeperAI():
                             count -= 1
                         elif (i, j) not in self.safes:
                             cells.append((i, j))
-        self.knowledge.append(Sentence(cells, count))
-
-        # 4
-        for sentence in self.knowledge:
-            safe = sentence.known_safes()
-            mine = sentence.known_mines()
-            if safe != None:
-                self.safes = self.safes.union(safe)
-            if mine != None:
-                self.mines = self.mines.union(mine)
-
-        # 5
-        for i in range(len(self.knowledge)):
-            for j in range(i + 1, len(self.knowledge)):
-                s1 = self.knowledge[i] # sentence 1
-                s2 = self.knowledge[j] # sentence 2
-                if s1.cells.issubset(s2.cells): # check if s1 is subset of s2
-                    cells = s2.cells - s1.cells
-                    s = Sentence(s2.cells - s1.cells, s2.count - s1.count)
-                    # to see whether repeated
-                    if s not in self.knowledge:
-                        self.knowledge.append(s)
-                elif s2.cells.issubset(s1.cells): # check if s2 is subset of s1
-                    cells = s1.cells - s2.cells
-                    s = Sentence(s1.cells - s2.cells, s1.count - s2.count)
-                    # to see whether repeated
-                    if s not in self.knowledge:
-                        self.knowledge.append(s)
-        
-            
-      
+        self.add_sentence(Sentence(cells, count))
 
-                    
-        
+        # 4 and 5
+        self.infer()
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base, unless it is empty or
+        already known. A sentence that settles all of its cells is not
+        stored; its cells are queued to be marked as mines or safe instead.
+        """
+        if not sentence.cells:
+            return
+        safes = sentence.known_safes()
+        if safes is not None:
+            self.pending_safes.extend(safes)
+            return
+        mines = sentence.known_mines()
+        if mines is not None:
+            self.pending_mines.extend(mines)
+            return
+
+        key = (frozenset(sentence.cells), sentence.count)
+        if key in self.knowledge:
+            return
+        self.knowledge[key] = sentence
+        for cell in key[0]:
+            self.index.setdefault(cell, set()).add(key)
+        self.pending_sentences.append(key)
+
+    def sentences(self):
+        """Returns a list of (cells, count) pairs for every known sentence."""
+        return list(self.knowledge)
+
+    def remove_sentence(self, key):
+        """Removes a sentence from the knowledge base and returns it."""
+        sentence = self.knowledge.pop(key)
+        for cell in key[0]:
+            keys = self.index[cell]
+            keys.discard(key)
+            if not keys:
+                del self.index[cell]
+        return sentence
+
+    def infer(self):
+        """
+        Draws conclusions from the knowledge base until nothing new follows,
+        only revisiting sentences that mention a cell that changed.
+        """
+        while self.pending_mines or self.pending_safes or self.pending_sentences:
+
+            # Remove newly known cells from every sentence mentioning them
+            if self.pending_mines or self.pending_safes:
+                mine = bool(self.pending_mines)
+                cell = (self.pending_mines or self.pending_safes).pop()
+                known = self.mines if mine else self.safes
+                if cell in known:
+                    continue
+                known.add(cell)
+                if not mine and cell not in self.moves_made:
+                    self.safe_moves.add(cell)
+                for key in list(self.index.get(cell, ())):
+                    sentence = self.remove_sentence(key)
+                    if mine:
+                        sentence.mark_mine(cell)
+                    else:
+                        sentence.mark_safe(cell)
+                    self.add_sentence(sentence)
+                continue
+
+            # Compare a new sentence with each sentence it overlaps: if one's
+            # cells are a subset of the other's, their difference is known
+            key = self.pending_sentences.pop()
+            if key not in self.knowledge:
+                continue
+            cells, count = key
+            overlapping = set()
+            for cell in cells:
+                overlapping.update(self.index[cell])
+            overlapping.discard(key)
+            for other_cells, other_count in overlapping:
+                if cells < other_cells:
+                    self.add_sentence(
+                        Sentence(other_cells - cells, other_count - count)
+                    )
+                elif other_cells < cells:
+                    self.add_sentence(
+                        Sentence(cells - other_cells, count - other_count)
+                    )
 
     def make_safe_move(self):
         """
@@ -259,13 +334,9 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for cell in self.safes:
-            if cell not in self.moves_made:
-                return cell
-
-        
+        for cell in self.safe_moves:
+            return cell
         return None
-        
 
     def make_random_move(self):
         """
@@ -273,19 +344,149 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
-        """
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i, j) not in self.moves_made and (i, j) not in self.mines:
-                    return (i, j)
-        
-        return None
-       
-
-
-
 
+        Among those cells, only the ones least likely to be a mine are
+        considered, given the knowledge base and the number of mines.
+        """
+        unknown = [
+            (i, j)
+            for i in range(self.height)
+            for j in range(self.width)
+            if (i, j) not in self.moves_made and (i, j) not in self.mines
+        ]
+        if not unknown:
+            return None
+
+        mines_left = None
+        if self.total_mines is not None:
+            mines_left = self.total_mines - len(self.mines)
+        probabilities = mine_probabilities(
+            self.sentences(), unknown, mines_left, self.probability_cache
+        )
+        lowest = min(probabilities[cell] for cell in unknown)
+        return random.choice([
+            cell for cell in unknown if probabilities[cell] <= lowest + 1e-12
+        ])
+
+
+class BitboardMinesweeperAI(MinesweeperAI):
+    """
+    Minesweeper game player that stores each sentence as an integer
+    bitmask over board positions and a count, which makes the subset tests
+    and differences of inference single integer operations.
 
+    `self.knowledge` is a set of (mask, count) pairs, and `self.index` maps
+    each board position to the pairs whose mask includes it.
+    """
 
+    def __init__(self, height=8, width=8, mines=None):
+        super().__init__(height=height, width=width, mines=mines)
+        self.knowledge = set()
 
+    def position(self, cell):
+        """Returns the board position of a cell, i.e. its bit number."""
+        return cell[0] * self.width + cell[1]
 
+    def cells(self, mask):
+        """Returns the list of cells whose bits are set in `mask`."""
+        cells = []
+        while mask:
+            low = mask & -mask
+            position = low.bit_length() - 1
+            cells.append(divmod(position, self.width))
+            mask ^= low
+        return cells
+
+    def positions(self, mask):
+        """Returns the list of positions whose bits are set in `mask`."""
+        positions = []
+        while mask:
+            low = mask & -mask
+            positions.append(low.bit_length() - 1)
+            mask ^= low
+        return positions
+
+    def sentences(self):
+        return [
+            (frozenset(self.cells(mask)), count)
+            for mask, count in self.knowledge
+        ]
+
+    def add_sentence(self, sentence):
+        mask = 0
+        for cell in sentence.cells:
+            mask |= 1 << self.position(cell)
+        self.add_mask(mask, sentence.count)
+
+    def add_mask(self, mask, count):
+        """
+        Adds the sentence that `count` of the cells in `mask` are mines,
+        unless it is empty or already known. A sentence that settles all of
+        its cells is not stored; its cells are queued as mines or safe.
+        """
+        if not mask:
+            return
+        if count == 0:
+            self.pending_safes.extend(self.cells(mask))
+            return
+        if count == mask.bit_count():
+            self.pending_mines.extend(self.cells(mask))
+            return
+
+        key = (mask, count)
+        if key in self.knowledge:
+            return
+        self.knowledge.add(key)
+        for position in self.positions(mask):
+            self.index.setdefault(position, set()).add(key)
+        self.pending_sentences.append(key)
+
+    def remove_sentence(self, key):
+        """Removes a sentence from the knowledge base."""
+        self.knowledge.remove(key)
+        for position in self.positions(key[0]):
+            keys = self.index[position]
+            keys.discard(key)
+            if not keys:
+                del self.index[position]
+
+    def infer(self):
+        """
+        Draws conclusions from the knowledge base until nothing new follows,
+        only revisiting sentences that mention a cell that changed.
+        """
+        while self.pending_mines or self.pending_safes or self.pending_sentences:
+
+            # Remove newly known cells from every sentence mentioning them
+            if self.pending_mines or self.pending_safes:
+                mine = bool(self.pending_mines)
+                cell = (self.pending_mines or self.pending_safes).pop()
+                known = self.mines if mine else self.safes
+                if cell in known:
+                    continue
+                known.add(cell)
+                if not mine and cell not in self.moves_made:
+                    self.safe_moves.add(cell)
+                position = self.position(cell)
+                bit = 1 << position
+                for key in list(self.index.get(position, ())):
+                    self.remove_sentence(key)
+                    mask, count = key
+                    self.add_mask(mask & ~bit, count - mine)
+                continue
+
+            # Compare a new sentence with each sentence it overlaps: if one's
+            # mask is a subset of the other's, their difference is known
+            key = self.pending_sentences.pop()
+            if key not in self.knowledge:
+                continue
+            mask, count = key
+            overlapping = set()
+            for position in self.positions(mask):
+                overlapping.update(self.index[position])
+            overlapping.discard(key)
+            for other_mask, other_count in overlapping:
+                if mask & ~other_mask == 0:
+                    self.add_mask(other_mask & ~mask, other_count - count)
+                elif other_mask & ~mask == 0:
+                    self.add_mask(mask & ~other_mask, count - other_count)
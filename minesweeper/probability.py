@@ -0,0 +1,342 @@
+import math
+import random
+
+# Search nodes allowed when enumerating one frontier component exactly,
+# before falling back to sampling; bounds the time spent per move
+NODE_BUDGET = 200000
+
+# Largest component enumerated exactly, as the search recurses once per cell
+EXACT_CELLS = 500
+
+# Consistent configurations drawn for a component that is too large to
+# enumerate, and search nodes allowed for drawing each of them
+SAMPLES = 200
+SAMPLE_NODE_BUDGET = 2000
+
+
+class BudgetExceeded(Exception):
+    """Raised when enumerating a component needs more nodes than allowed."""
+
+
+def mine_probabilities(sentences, unknown, mines_left=None, cache=None):
+    """
+    Return a dict mapping each cell in `unknown` to the probability that it
+    is a mine, given `sentences`: (cells, count) pairs whose cells are all
+    in `unknown`.
+
+    The constrained cells are split into independent components, each
+    enumerated exactly (or sampled if too large). If `mines_left`, the
+    number of mines among the unknown cells, is given, components are
+    combined by weighting every way of placing the remaining mines on the
+    unconstrained cells; otherwise every consistent configuration is taken
+    to be equally likely.
+
+    `cache`, if given, is a dict of component results from previous calls,
+    keyed by their sentences; it is updated to hold this call's components.
+    """
+    components = split_components(sentences)
+    results = []
+    used = dict()
+    for component in components:
+        key = frozenset(component)
+        if cache is not None and key in cache:
+            result = cache[key]
+        else:
+            result = enumerate_component(component)
+        used[key] = result
+        results.append(result)
+    if cache is not None:
+        cache.clear()
+        cache.update(used)
+
+    constrained = set()
+    for cells, count in sentences:
+        constrained.update(cells)
+    free = len(unknown) - len(constrained)
+
+    def weight(mines):
+        """Ways to place the rest of the mines on unconstrained cells."""
+        if mines_left is None:
+            return 1
+        rest = mines_left - mines
+        return math.comb(free, rest) if 0 <= rest <= free else 0
+
+    # Distribution of mine counts over all components together, and over
+    # all components but one, from prefix and suffix convolutions
+    distributions = [
+        {k: ways for k, (ways, cells) in result.items()} for result in results
+    ]
+    prefixes = [{0: 1}]
+    for distribution in distributions:
+        prefixes.append(convolve([prefixes[-1], distribution]))
+    suffixes = [{0: 1}]
+    for distribution in reversed(distributions):
+        suffixes.append(convolve([suffixes[-1], distribution]))
+    suffixes.reverse()
+    totals = prefixes[-1]
+
+    probabilities = dict()
+    for index, result in enumerate(results):
+        others = convolve([prefixes[index], suffixes[index + 1]])
+        total = 0
+        mine_weights = dict()
+        for k, (ways, cells) in result.items():
+            for other_k, other_ways in others.items():
+                w = other_ways * weight(k + other_k)
+                if not w:
+                    continue
+                total += ways * w
+                for cell, count in cells.items():
+                    mine_weights[cell] = mine_weights.get(cell, 0) + count * w
+        component_cells = set()
+        for cells, count in components[index]:
+            component_cells.update(cells)
+        for cell in component_cells:
+            probabilities[cell] = (
+                mine_weights.get(cell, 0) / total if total else 0.5
+            )
+
+    # Unconstrained cells share the mines not expected on the frontier
+    if free:
+        total = sum(ways * weight(k) for k, ways in totals.items())
+        if mines_left is not None and total:
+            expected = sum(
+                ways * weight(k) * (mines_left - k)
+                for k, ways in totals.items()
+            ) / total
+            density = expected / free
+        elif probabilities:
+            density = sum(probabilities.values()) / len(probabilities)
+        else:
+            density = 0.5
+        for cell in unknown:
+            if cell not in constrained:
+                probabilities[cell] = density
+
+    return probabilities
+
+
+def split_components(sentences):
+    """
+    Group `sentences` into lists whose cells are disjoint from every other
+    group's, so that each group can be solved independently.
+    """
+    parent = dict()
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, count in sentences:
+        cells = list(cells)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            parent[find(cell)] = root
+
+    components = dict()
+    for sentence in sentences:
+        root = find(next(iter(sentence[0])))
+        components.setdefault(root, []).append(sentence)
+    return list(components.values())
+
+
+def convolve(distributions):
+    """
+    Given dicts mapping mine counts to numbers of ways, return the
+    distribution of the total mine count.
+    """
+    result = {0: 1}
+    for distribution in distributions:
+        combined = dict()
+        for k, ways in result.items():
+            for other_k, other_ways in distribution.items():
+                combined[k + other_k] = (
+                    combined.get(k + other_k, 0) + ways * other_ways
+                )
+        result = combined
+    return result
+
+
+def enumerate_component(sentences):
+    """
+    Count the mine configurations consistent with a component's
+    `sentences`.
+
+    Return a dict mapping each possible number of mines k to a tuple
+    `(ways, cells)`, where `ways` is the number of configurations with k
+    mines and `cells` maps each cell to how many of those configurations
+    have a mine there. If exact enumeration exceeds NODE_BUDGET, the counts
+    are estimated from sampled configurations instead.
+    """
+    order = order_cells(sentences)
+    if len(order) <= EXACT_CELLS:
+        try:
+            return count_configurations(order, sentences)
+        except BudgetExceeded:
+            pass
+    return sample_configurations(order, sentences)
+
+
+def order_cells(sentences):
+    """
+    Return the cells of `sentences` in breadth-first order, so that each
+    sentence's cells tend to be assigned close together.
+    """
+    containing = dict()
+    for position, (cells, count) in enumerate(sentences):
+        for cell in cells:
+            containing.setdefault(cell, []).append(position)
+
+    order = []
+    seen = set()
+    visited = set()
+    queue = [0]
+    visited.add(0)
+    while queue:
+        position = queue.pop(0)
+        for cell in sorted(sentences[position][0]):
+            if cell in seen:
+                continue
+            seen.add(cell)
+            order.append(cell)
+            for other in containing[cell]:
+                if other not in visited:
+                    visited.add(other)
+                    queue.append(other)
+    return order
+
+
+def compile_constraints(order, sentences):
+    """
+    Return, for each position in `order`, a list of (sentence index, cells
+    of that sentence after this position) pairs, and for each position the
+    indices of sentences that are partly but not fully assigned before it.
+    """
+    position = {cell: i for i, cell in enumerate(order)}
+    n = len(order)
+    checks = [[] for _ in range(n)]
+    open_at = [[] for _ in range(n + 1)]
+    for index, (cells, count) in enumerate(sentences):
+        positions = sorted(position[cell] for cell in cells)
+        for rank, i in enumerate(positions):
+            checks[i].append((index, len(positions) - rank - 1))
+        for i in range(positions[0] + 1, positions[-1] + 1):
+            open_at[i].append(index)
+    return checks, open_at
+
+
+def count_configurations(order, sentences):
+    """
+    Enumerate configurations by backtracking over `order`, memoizing on
+    the position and the mine counts of the partly assigned sentences.
+    """
+    checks, open_at = compile_constraints(order, sentences)
+    counts = [count for cells, count in sentences]
+    mines = [0] * len(sentences)
+    n = len(order)
+    memo = dict()
+    nodes = 0
+
+    def solve(i):
+        nonlocal nodes
+        if i == n:
+            return {0: (1, [])}
+        key = (i, tuple(mines[index] for index in open_at[i]))
+        if key in memo:
+            return memo[key]
+        nodes += 1
+        if nodes > NODE_BUDGET:
+            raise BudgetExceeded()
+
+        result = dict()
+        for value in (0, 1):
+            if not all(
+                mines[index] + value <= counts[index]
+                and mines[index] + value + remaining >= counts[index]
+                for index, remaining in checks[i]
+            ):
+                continue
+            for index, remaining in checks[i]:
+                mines[index] += value
+            sub = solve(i + 1)
+            for index, remaining in checks[i]:
+                mines[index] -= value
+
+            for k, (ways, cells) in sub.items():
+                entry = result.get(k + value)
+                if entry is None:
+                    entry = result[k + value] = [0, [0] * (n - i)]
+                entry[0] += ways
+                entry[1][0] += value * ways
+                vector = entry[1]
+                for t, count in enumerate(cells):
+                    vector[t + 1] += count
+        result = {k: (ways, cells) for k, (ways, cells) in result.items()}
+        memo[key] = result
+        return result
+
+    return {
+        k: (ways, dict(zip(order, cells)))
+        for k, (ways, cells) in solve(0).items()
+    }
+
+
+def sample_configurations(order, sentences, rng=random):
+    """
+    Estimate configuration counts from SAMPLES randomized searches, each
+    returning the first consistent configuration it finds. This is only
+    an approximation: configurations are not drawn exactly uniformly.
+    """
+    checks, open_at = compile_constraints(order, sentences)
+    counts = [count for cells, count in sentences]
+    n = len(order)
+    result = dict()
+
+    for _ in range(SAMPLES):
+        mines = [0] * len(sentences)
+        values = [0] * n
+        nodes = 0
+
+        # Iterative backtracking: try each cell's values in random order
+        choices = [None] * n
+        i = 0
+        while 0 <= i < n and nodes < SAMPLE_NODE_BUDGET:
+            if choices[i] is None:
+                choices[i] = [0, 1] if rng.random() < 0.5 else [1, 0]
+            else:
+                for index, remaining in checks[i]:
+                    mines[index] -= values[i]
+            while choices[i]:
+                value = choices[i].pop()
+                if all(
+                    mines[index] + value <= counts[index]
+                    and mines[index] + value + remaining >= counts[index]
+                    for index, remaining in checks[i]
+                ):
+                    break
+            else:
+                choices[i] = None
+                values[i] = 0
+                i -= 1
+                continue
+            values[i] = value
+            for index, remaining in checks[i]:
+                mines[index] += value
+            nodes += 1
+            i += 1
+        if i != n:
+            continue
+
+        k = sum(values)
+        entry = result.setdefault(k, [0, dict.fromkeys(order, 0)])
+        entry[0] += 1
+        for cell, value in zip(order, values):
+            entry[1][cell] += value
+
+    if not result:
+        result[0] = [1, dict.fromkeys(order, 0)]
+    return {k: (ways, cells) for k, (ways, cells) in result.items()}
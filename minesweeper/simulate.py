@@ -0,0 +1,204 @@
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+from minesweeper import BitboardMinesweeperAI, Minesweeper, MinesweeperAI
+
+HEIGHT = 8
+WIDTH = 8
+MINES = 8
+
+# Games played by a worker per task; results are summed before returning
+BATCH_SIZE = 100
+
+# Per-move inference times are counted in buckets growing by this factor
+# from one microsecond, so that percentiles can be merged across workers
+BUCKET_GROWTH = 1.25
+
+
+def main():
+
+    # Check usage
+    options = set(sys.argv[5:])
+    if len(sys.argv) not in [2, 5, 6, 7] or options - {"array", "bitboard"}:
+        sys.exit("Usage: python simulate.py games "
+                 "[height width mines [array] [bitboard]]")
+    games = int(sys.argv[1])
+    if len(sys.argv) >= 5:
+        height, width, mines = (int(arg) for arg in sys.argv[2:5])
+    else:
+        height, width, mines = HEIGHT, WIDTH, MINES
+
+    start = time.perf_counter()
+    stats = simulate(
+        games, height, width, mines,
+        array="array" in options, bitboard="bitboard" in options
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"Board: {height}x{width} with {mines} mines")
+    print(f"Games: {stats['games']} in {elapsed:.2f}s "
+          f"({stats['games'] / elapsed:.0f} games/s)")
+    print(f"Win rate: {100 * stats['wins'] / stats['games']:.2f}%")
+    print(f"Moves per game: {stats['moves'] / stats['games']:.1f} "
+          f"({stats['guesses'] / stats['games']:.2f} guesses)")
+    print(f"Inference time per move: "
+          f"mean {1e6 * stats['time'] / max(stats['moves'], 1):.1f}us, "
+          f"p50 {1e6 * percentile(stats['histogram'], 0.5):.1f}us, "
+          f"p99 {1e6 * percentile(stats['histogram'], 0.99):.1f}us, "
+          f"max {1e6 * stats['max_time']:.1f}us")
+    print(f"Knowledge base size: "
+          f"mean peak {stats['knowledge'] / stats['games']:.1f}, "
+          f"max {stats['max_knowledge']} sentences")
+
+
+def play_game(height, width, mines, seed, array=False, bitboard=False):
+    """
+    Play one game between a fresh board and AI, seeded with `seed`.
+
+    If `array` is True, the game is played on an `ArrayMinesweeper` board,
+    which also reveals whole regions around cells with no nearby mines.
+    If `bitboard` is True, the AI is a `BitboardMinesweeperAI`.
+
+    Return a dict with whether the game was won, the number of moves and
+    of guesses made, the AI's inference time for each move, and the peak
+    size of its knowledge base.
+    """
+    random.seed(seed)
+    if array:
+        from array_board import ArrayMinesweeper
+        game = ArrayMinesweeper(
+            height=height, width=width, mines=mines, seed=seed
+        )
+    else:
+        game = Minesweeper(height=height, width=width, mines=mines)
+    player = BitboardMinesweeperAI if bitboard else MinesweeperAI
+    ai = player(height=height, width=width, mines=mines)
+    safe_cells = height * width - mines
+
+    times = []
+    guesses = 0
+    knowledge = 0
+    won = False
+    while True:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            guesses += 1
+        elapsed = time.perf_counter() - start
+        if move is None or game.is_mine(move):
+            times.append(elapsed)
+            break
+
+        # Time only the AI, not the board revealing cells
+        if array:
+            revealed = game.reveal(move)
+        else:
+            revealed = [(move, game.nearby_mines(move))]
+        start = time.perf_counter()
+        for cell, count in revealed:
+            ai.add_knowledge(cell, count)
+        times.append(elapsed + time.perf_counter() - start)
+
+        knowledge = max(knowledge, len(ai.knowledge))
+        if len(ai.moves_made) == safe_cells:
+            won = True
+            break
+
+    return {
+        "won": won,
+        "moves": len(times),
+        "guesses": guesses,
+        "times": times,
+        "knowledge": knowledge,
+    }
+
+
+def play_batch(args):
+    """Play a batch of seeded games and return their summed statistics."""
+    height, width, mines, seeds, array, bitboard = args
+    stats = empty_stats()
+    for seed in seeds:
+        result = play_game(height, width, mines, seed, array, bitboard)
+        stats["games"] += 1
+        stats["wins"] += result["won"]
+        stats["moves"] += result["moves"]
+        stats["guesses"] += result["guesses"]
+        stats["knowledge"] += result["knowledge"]
+        stats["max_knowledge"] = max(
+            stats["max_knowledge"], result["knowledge"]
+        )
+        for t in result["times"]:
+            stats["time"] += t
+            stats["max_time"] = max(stats["max_time"], t)
+            bucket = bucket_of(t)
+            stats["histogram"][bucket] = stats["histogram"].get(bucket, 0) + 1
+    return stats
+
+
+def empty_stats():
+    return {
+        "games": 0,
+        "wins": 0,
+        "moves": 0,
+        "guesses": 0,
+        "knowledge": 0,
+        "max_knowledge": 0,
+        "time": 0.0,
+        "max_time": 0.0,
+        "histogram": dict(),
+    }
+
+
+def merge_stats(total, stats):
+    """Add the statistics in `stats` into `total`."""
+    for key in ("games", "wins", "moves", "guesses", "knowledge", "time"):
+        total[key] += stats[key]
+    for key in ("max_knowledge", "max_time"):
+        total[key] = max(total[key], stats[key])
+    for bucket, count in stats["histogram"].items():
+        total["histogram"][bucket] = total["histogram"].get(bucket, 0) + count
+
+
+def bucket_of(t):
+    """Return the histogram bucket for a duration of `t` seconds."""
+    if t <= 1e-6:
+        return 0
+    return int(math.log(t / 1e-6, BUCKET_GROWTH)) + 1
+
+
+def percentile(histogram, fraction):
+    """Return the upper bound of the bucket holding the given percentile."""
+    total = sum(histogram.values())
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= fraction * total:
+            return 1e-6 * BUCKET_GROWTH ** bucket
+    return 0.0
+
+
+def simulate(games, height, width, mines, processes=None, seed=0,
+             array=False, bitboard=False):
+    """
+    Play `games` games, seeded `seed`, `seed + 1`, ..., in a pool of worker
+    processes, and return their combined statistics.
+    """
+    tasks = [
+        (height, width, mines,
+         range(seed + start, seed + min(start + BATCH_SIZE, games)),
+         array, bitboard)
+        for start in range(0, games, BATCH_SIZE)
+    ]
+    total = empty_stats()
+    with multiprocessing.Pool(processes) as pool:
+        for stats in pool.imap_unordered(play_batch, tasks):
+            merge_stats(total, stats)
+    return total
+
+
+if __name__ == "__main__":
+    main()
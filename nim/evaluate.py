@@ -0,0 +1,97 @@
+import sys
+import time
+
+import numpy as np
+
+from qtable import QTableNimAI
+from solver import reachable_states, winning
+
+# Cumulative numbers of training games after which the AI is evaluated
+BUDGETS = [1000, 3000, 10000, 30000, 100000]
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [1, 2, 3]:
+        sys.exit("Usage: python evaluate.py [piles [subtraction]]")
+    initial = [1, 3, 5, 7]
+    subtraction = None
+    if len(sys.argv) >= 2:
+        initial = [int(pile) for pile in sys.argv[1].split(",")]
+    if len(sys.argv) == 3:
+        subtraction = {int(count) for count in sys.argv[2].split(",")}
+
+    player = QTableNimAI(initial, subtraction=subtraction)
+    print(f"Piles: {initial}, subtraction set: {subtraction}")
+    print(f"{'games':>8} {'states':>8} {'winning':>8} "
+          f"{'optimal':>8} {'accuracy':>9} {'time':>8}")
+    for budget in BUDGETS:
+        start = time.perf_counter()
+        player.self_play(budget - player.games)
+        elapsed = time.perf_counter() - start
+        result = evaluate(player)
+        print(f"{budget:>8} {result['states']:>8} {result['winning']:>8} "
+              f"{result['optimal']:>8} {100 * result['accuracy']:>8.2f}% "
+              f"{elapsed:>7.2f}s")
+
+
+def evaluate(ai, initial=None):
+    """
+    Measure how often `ai` plays perfectly over every non-terminal state
+    reachable from `initial` piles, in the variant given by its
+    subtraction set.
+
+    Only winning states count towards accuracy, since from a lost state
+    every move loses. Return a dict with the number of `states`, of
+    `winning` states, of winning states where the AI's greedy move keeps
+    the win (`optimal`), and their ratio (`accuracy`).
+
+    By default the AI is evaluated on the initial piles it was trained on;
+    `initial` must be given if the AI does not record them. A `QTableNimAI`
+    is evaluated on all its states at once with array operations. Any
+    other AI is asked for a move in each state in turn.
+    """
+    subtraction = ai.subtraction
+    if initial is None:
+        initial = getattr(ai, "initial", None)
+        if initial is None:
+            raise ValueError("initial piles unknown; pass initial")
+    smallest = min(subtraction) if subtraction else 1
+    reachable = [
+        piles for piles in reachable_states(initial, subtraction)
+        if max(piles, default=0) >= smallest
+    ]
+    states = [piles for piles in reachable if winning(piles, subtraction)]
+
+    if isinstance(ai, QTableNimAI) and list(initial) == ai.initial:
+        indices = np.array([ai.encode(piles) for piles in states],
+                           dtype=np.int64)
+        lost = np.array([
+            not winning(ai.decode(state), subtraction)
+            for state in range(ai.num_states)
+        ])
+        if len(indices):
+            chosen = ai.q[indices].argmax(axis=1)
+            optimal = int(lost[ai.next_state[indices, chosen]].sum())
+        else:
+            optimal = 0
+    else:
+        optimal = 0
+        for piles in states:
+            i, j = ai.choose_action(list(piles), epsilon=False)
+            child = list(piles)
+            child[i] -= j
+            if not winning(child, subtraction):
+                optimal += 1
+
+    return {
+        "states": len(reachable),
+        "winning": len(states),
+        "optimal": optimal,
+        "accuracy": optimal / len(states) if states else 1.0,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -5,31 +5,36 @@ import time
 
 class Nim():
 
-    def __init__(self, initial=[1, 3, 5, 7]):
+    def __init__(self, initial=[1, 3, 5, 7], subtraction=None):
         """
         Initialize game board.
         Each game board has
             - `piles`: a list of how many elements remain in each pile
+            - `subtraction`: None, or the set of counts that may be
+              removed from a pile in one move
             - `player`: 0 or 1 to indicate which player's turn
             - `winner`: None, 0, or 1 to indicate who the winner is
         """
         self.piles = initial.copy()
+        self.subtraction = subtraction
         self.player = 0
         self.winner = None
 
     @classmethod
-    def available_actions(cls, piles):
+    def available_actions(cls, piles, subtraction=None):
         """
         Nim.available_actions(piles) takes a `piles` list as input
         and returns all of the available actions `(i, j)` in that state.
 
         Action `(i, j)` represents the action of removing `j` items
-        from pile `i` (where piles are 0-indexed).
+        from pile `i` (where piles are 0-indexed). If `subtraction` is
+        given, `j` must be one of its counts.
         """
         actions = set()
         for i, pile in enumerate(piles):
             for j in range(1, pile + 1):
-                actions.add((i, j))
+                if subtraction is None or j in subtraction:
+                    actions.add((i, j))
         return actions
 
     @classmethod
@@ -60,22 +65,29 @@ class Nim():
             raise Exception("Invalid pile")
         elif count < 1 or count > self.piles[pile]:
             raise Exception("Invalid number of objects")
+        elif self.subtraction is not None and count not in self.subtraction:
+            raise Exception("Invalid number of objects")
 
         # Update pile
         self.piles[pile] -= count
         self.switch_player()
 
-        # Check for a winner
-        if all(pile == 0 for pile in self.piles):
+        # Check for a winner: the player who cannot move wins, as the
+        # other player made the last move
+        smallest = min(self.subtraction) if self.subtraction else 1
+        if all(pile < smallest for pile in self.piles):
             self.winner = self.player
 
 
 class NimAI():
 
-    def __init__(self, alpha=0.5, epsilon=0.1):
+    def __init__(self, alpha=0.5, epsilon=0.1, subtraction=None,
+                 initial=None):
         """
         Initialize AI with an empty Q-learning dictionary,
-        an alpha (learning) rate, and an epsilon rate.
+        an alpha (learning) rate, an epsilon rate, the
+        subtraction set of the game variant it plays, if any,
+        and the initial piles it is trained on, if known.
 
         The Q-learning dictionary maps `(state, action)`
         pairs to a Q-value (a number).
@@ -85,6 +97,8 @@ class NimAI():
         self.q = dict()
         self.alpha = alpha
         self.epsilon = epsilon
+        self.subtraction = subtraction
+        self.initial = None if initial is None else list(initial)
 
     def update(self, old_state, action, new_state, reward):
         """
@@ -135,9 +149,10 @@ class NimAI():
         `state`, return 0.
         """
         best_reward = 0
-        if list(Nim.available_actions(list(state))) == []:         # if there is no available action
+        actions = list(Nim.available_actions(list(state), self.subtraction))
+        if actions == []:         # if there is no available action
             return 0
-        for action in list(Nim.available_actions(list(state))):
+        for action in actions:
             reward = self.get_q_value(state, action)
             best_reward = max(reward, best_reward)
         
@@ -161,7 +176,8 @@ class NimAI():
         """
         best_action = None
         best_reward = 0
-        for action in list(Nim.available_actions(list(state))):
+        actions = list(Nim.available_actions(list(state), self.subtraction))
+        for action in actions:
             if best_action is None or self.get_q_value(state, action) > best_reward:   # if there is no best action yet or its Q-value is bigger than the best reward
                 best_reward = self.get_q_value(state, action)
                 best_action = action
@@ -170,7 +186,7 @@ class NimAI():
         if epsilon is False:
             return best_action
         else:
-            my_list = [random.choice(list(Nim.available_actions(state))), best_action] # create a list of one random action and the best action
+            my_list = [random.choice(actions), best_action] # create a list of one random action and the best action
             return random.choices(my_list, weights = [self.epsilon, 1 - self.epsilon], k = 1)[0]
         
 
@@ -178,17 +194,28 @@ class NimAI():
             
 
 
-def train(n):
+def train(n, progress=1, initial=[1, 3, 5, 7], subtraction=None):
     """
-    Train an AI by playing `n` games against itself.
+    Train an AI by playing `n` games against itself, starting from
+    `initial` piles with moves limited to `subtraction`, if given.
+
+    Print a progress line every `progress` games, or never if `progress`
+    is 0 or None.
     """
 
-    player = NimAI()
+    player = NimAI(subtraction=subtraction, initial=initial)
+    start = time.perf_counter()
+
+    # No games can be played if the first player has no move
+    if not Nim.available_actions(initial, subtraction):
+        n = 0
 
     # Play n games
     for i in range(n):
-        print(f"Playing training game {i + 1}")
-        game = Nim()
+        if progress and (i + 1) % progress == 0:
+            rate = (i + 1) / max(time.perf_counter() - start, 1e-9)
+            print(f"Playing training game {i + 1} ({rate:.0f} games/s)")
+        game = Nim(initial, subtraction)
 
         # Keep track of last move made by either player
         last = {
@@ -214,12 +241,15 @@ def train(n):
             # When game is over, update Q values with rewards
             if game.winner is not None:
                 player.update(state, action, new_state, -1)
-                player.update(
-                    last[game.player]["state"],
-                    last[game.player]["action"],
-                    new_state,
-                    1
-                )
+                # The other player has not moved if the first move ended
+                # the game
+                if last[game.player]["state"] is not None:
+                    player.update(
+                        last[game.player]["state"],
+                        last[game.player]["action"],
+                        new_state,
+                        1
+                    )
                 break
 
             # If game is continuing, no rewards yet
@@ -237,11 +267,12 @@ def train(n):
     return player
 
 
-def play(ai, human_player=None):
+def play(ai, human_player=None, initial=[1, 3, 5, 7], subtraction=None):
     """
     Play human game against the AI.
     `human_player` can be set to 0 or 1 to specify whether
     human player moves first or second.
+    `initial` and `subtraction` choose the game variant.
     """
 
     # If no player order set, choose human's order randomly
@@ -249,7 +280,7 @@ def play(ai, human_player=None):
         human_player = random.randint(0, 1)
 
     # Create new game
-    game = Nim()
+    game = Nim(initial, subtraction)
 
     # Game loop
     while True:
@@ -262,7 +293,7 @@ def play(ai, human_player=None):
         print()
 
         # Compute available actions
-        available_actions = Nim.available_actions(game.piles)
+        available_actions = Nim.available_actions(game.piles, subtraction)
         time.sleep(1)
 
         # Let human make a move
@@ -1,4 +1,17 @@
-from nim import train, play
+import os
 
-ai = train(10000)
-play(ai)
+from nim import play
+from qtable import QTableNimAI, train
+
+CHECKPOINT = "nim.npz"
+GAMES = 10000
+
+# Load the trained AI if a checkpoint exists, otherwise train and save one
+if os.path.exists(CHECKPOINT):
+    ai = QTableNimAI.load(CHECKPOINT)
+else:
+    ai = train(GAMES)
+    ai.save(CHECKPOINT)
+
+# Play the game the AI was trained on, as recorded in its checkpoint
+play(ai, initial=ai.initial, subtraction=ai.subtraction)
@@ -0,0 +1,532 @@
+import json
+import multiprocessing
+import time
+
+import numpy as np
+
+
+class QTableNimAI():
+    """
+    Q-learning Nim player that stores its Q-values in a dense NumPy array.
+
+    The finite state space for a given initial board is enumerated up front:
+    a state (a list of piles) is encoded as a mixed-radix integer whose
+    digits are the pile sizes, and action `(i, j)` is encoded as the index
+    of `j` in pile `i`'s block of actions. Legal actions and successor
+    states are precomputed, so choosing an action or updating a Q-value is
+    array indexing.
+
+    The methods of `NimAI` are supported with the same arguments, so this
+    player can be used anywhere a `NimAI` is.
+    """
+
+    def __init__(self, initial=[1, 3, 5, 7], alpha=0.5, epsilon=0.1,
+                 subtraction=None):
+        self.initial = list(initial)
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.subtraction = subtraction
+
+        # Mixed-radix strides, one digit per pile
+        self.strides = []
+        stride = 1
+        for pile in reversed(self.initial):
+            self.strides.insert(0, stride)
+            stride *= pile + 1
+        self.num_states = stride
+        self.start = self.encode(self.initial)
+
+        # Action (i, j) has index offsets[i] + j - 1
+        self.offsets = []
+        offset = 0
+        for pile in self.initial:
+            self.offsets.append(offset)
+            offset += pile
+        self.actions = [
+            (i, j)
+            for i, pile in enumerate(self.initial)
+            for j in range(1, pile + 1)
+        ]
+        self.num_actions = len(self.actions)
+
+        # Successor of each (state, action) pair, or -1 where illegal, and
+        # the legal actions of each state
+        self.next_state = np.full(
+            (self.num_states, self.num_actions), -1, dtype=np.int64
+        )
+        self.legal = []
+        for state in range(self.num_states):
+            piles = self.decode(state)
+            legal = []
+            for action, (i, j) in enumerate(self.actions):
+                if j <= piles[i] and (subtraction is None or j in subtraction):
+                    self.next_state[state, action] = state - j * self.strides[i]
+                    legal.append(action)
+            self.legal.append(np.array(legal, dtype=np.int64))
+
+        # States with no legal actions, where the game is over
+        self.terminal = np.array([len(legal) == 0 for legal in self.legal])
+
+        # Illegal actions hold -inf, so that a plain row maximum only
+        # considers legal ones
+        self.q = np.where(self.next_state >= 0, 0.0, -np.inf)
+        self.rng = np.random.default_rng()
+
+        # Number of updates made to each (state, action) pair, and number
+        # of training games played
+        self.visits = np.zeros((self.num_states, self.num_actions), np.int64)
+        self.games = 0
+
+    # Version of the checkpoint format written by `save`
+    CHECKPOINT_VERSION = 1
+
+    def save(self, filename):
+        """
+        Save the model to `filename` as a NumPy .npz archive holding the
+        Q-values and visit counts, plus a header of the initial piles,
+        subtraction set, hyperparameters and number of games trained.
+        """
+        subtraction = sorted(self.subtraction) if self.subtraction else []
+        with open(filename, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=QTableNimAI.CHECKPOINT_VERSION,
+                initial=np.array(self.initial),
+                subtraction=np.array(subtraction, dtype=np.int64),
+                alpha=self.alpha,
+                epsilon=self.epsilon,
+                games=self.games,
+                q=self.q,
+                visits=self.visits,
+            )
+
+    @classmethod
+    def load(cls, filename):
+        """Load a model saved with `save` from `filename`."""
+        with np.load(filename) as data:
+            if int(data["version"]) != QTableNimAI.CHECKPOINT_VERSION:
+                raise Exception("Unsupported checkpoint version")
+            subtraction = None
+            if "subtraction" in data.files and len(data["subtraction"]):
+                subtraction = {int(count) for count in data["subtraction"]}
+            player = cls(
+                [int(pile) for pile in data["initial"]],
+                alpha=float(data["alpha"]),
+                epsilon=float(data["epsilon"]),
+                subtraction=subtraction
+            )
+            if data["q"].shape != player.q.shape:
+                raise Exception("Checkpoint does not match its piles")
+            player.q = data["q"]
+            player.visits = data["visits"]
+            player.games = int(data["games"])
+        return player
+
+    def encode(self, piles):
+        """Return the integer index of the state `piles`."""
+        return sum(pile * stride for pile, stride in zip(piles, self.strides))
+
+    def decode(self, state):
+        """Return the piles of the state with integer index `state`."""
+        piles = []
+        for stride in self.strides:
+            pile, state = divmod(state, stride)
+            piles.append(pile)
+        return piles
+
+    def action_index(self, action):
+        """Return the integer index of action `(i, j)`."""
+        i, j = action
+        return self.offsets[i] + j - 1
+
+    def seed(self, seed):
+        """Seed the random number generator used for exploration."""
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, old_state, action, new_state, reward):
+        """
+        Update Q-learning model, given an old state, an action taken
+        in that state, a new resulting state, and the reward received
+        from taking that action.
+        """
+        self.update_index(
+            self.encode(old_state), self.action_index(action),
+            self.encode(new_state), reward
+        )
+
+    def update_index(self, state, action, new_state, reward):
+        """`update`, with states and action given as integer indices."""
+        best_future = (
+            0.0 if self.terminal[new_state] else self.q[new_state].max()
+        )
+        old = self.q[state, action]
+        self.q[state, action] = old + self.alpha * (reward + best_future - old)
+        self.visits[state, action] += 1
+
+    def get_q_value(self, state, action):
+        """
+        Return the Q-value for the state `state` and the action `action`.
+        """
+        return float(self.q[self.encode(state), self.action_index(action)])
+
+    def update_q_value(self, state, action, old_q, reward, future_rewards):
+        """
+        Update the Q-value for the state `state` and the action `action`
+        given the previous Q-value `old_q`, a current reward `reward`,
+        and an estimate of future rewards `future_rewards`.
+        """
+        self.q[self.encode(state), self.action_index(action)] = (
+            old_q + self.alpha * (reward + future_rewards - old_q)
+        )
+
+    def best_future_reward(self, state):
+        """
+        Given a state `state`, return the maximum Q-value of its available
+        actions, or 0 if there are none.
+        """
+        state = self.encode(state)
+        return 0 if self.terminal[state] else float(self.q[state].max())
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Given a state `state`, return an action `(i, j)` to take: the
+        action with the highest Q-value or, if `epsilon` is `True`, a random
+        available action with probability `self.epsilon`.
+        """
+        return self.actions[self.choose_index(self.encode(state), epsilon)]
+
+    def choose_index(self, state, epsilon=True):
+        """`choose_action`, with state and action as integer indices."""
+        if epsilon and self.rng.random() < self.epsilon:
+            legal = self.legal[state]
+            return int(legal[self.rng.integers(len(legal))])
+        return int(self.q[state].argmax())
+
+    def self_play(self, n, batch=1):
+        """
+        Train by playing `n` games against itself, with the same updates
+        as `nim.train`, entirely on integer states and actions.
+
+        If `batch` is greater than 1, that many games are played side by
+        side, each step choosing moves and updating Q-values for all of them
+        with single array operations. Updates within a step are computed
+        from the Q-values before that step, so when two games update the
+        same pair at once, only one of the updates is kept.
+        """
+        self.games += n
+        if self.terminal[self.start]:
+            return
+        if batch > 1:
+            return self.self_play_batch(n, batch)
+
+        for _ in range(n):
+            last = [None, None]
+            player = 0
+            state = self.start
+
+            while True:
+                action = self.choose_index(state)
+                new_state = int(self.next_state[state, action])
+                last[player] = (state, action)
+                player = 1 - player
+
+                # When game is over, update Q values with rewards
+                if self.terminal[new_state]:
+                    self.update_index(state, action, new_state, -1)
+                    if last[player] is not None:
+                        self.update_index(*last[player], new_state, 1)
+                    break
+
+                # If game is continuing, no rewards yet
+                elif last[player] is not None:
+                    self.update_index(*last[player], new_state, 0)
+                state = new_state
+
+    def update_batch(self, states, actions, new_states, reward):
+        """`update_index` for arrays of states, actions and new states."""
+        best_future = np.where(
+            self.terminal[new_states], 0.0, self.q[new_states].max(axis=1)
+        )
+        old = self.q[states, actions]
+        self.q[states, actions] = old + self.alpha * (
+            reward + best_future - old
+        )
+        np.add.at(self.visits, (states, actions), 1)
+
+    def self_play_batch(self, n, batch):
+        """Play `n` games, `batch` at a time; see `self_play`."""
+        batch = min(batch, n)
+        games = np.arange(batch)
+        states = np.full(batch, self.start)
+        players = np.zeros(batch, dtype=np.int64)
+        last_states = np.full((2, batch), -1)
+        last_actions = np.full((2, batch), -1)
+        started = batch
+
+        while len(games):
+            s = states[games]
+
+            # Greedy actions, or with probability epsilon a random legal one
+            actions = self.q[s].argmax(axis=1)
+            explore = self.rng.random(len(games)) < self.epsilon
+            if explore.any():
+                legal = self.next_state[s[explore]] >= 0
+                scores = np.where(
+                    legal, self.rng.random(legal.shape), -1.0
+                )
+                actions[explore] = scores.argmax(axis=1)
+            new = self.next_state[s, actions]
+
+            p = players[games]
+            last_states[p, games] = s
+            last_actions[p, games] = actions
+            p = 1 - p
+            players[games] = p
+            previous_states = last_states[p, games]
+            previous_actions = last_actions[p, games]
+
+            # When a game is over, update Q values with rewards
+            done = self.terminal[new]
+            self.update_batch(s[done], actions[done], new[done], -1)
+            # The other player has not moved if the first move ended the game
+            won = done & (previous_states >= 0)
+            self.update_batch(
+                previous_states[won], previous_actions[won], new[won], 1
+            )
+
+            # If a game is continuing, no rewards yet
+            going = ~done & (previous_states >= 0)
+            self.update_batch(
+                previous_states[going], previous_actions[going],
+                new[going], 0
+            )
+            states[games] = new
+
+            # Start new games in place of finished ones, while any are left
+            finished = games[done]
+            restart = finished[:max(n - started, 0)]
+            started += len(restart)
+            states[restart] = self.start
+            players[restart] = 0
+            last_states[:, restart] = -1
+            last_actions[:, restart] = -1
+            games = np.concatenate([games[~done], restart])
+
+
+def train(n, initial=[1, 3, 5, 7], batch=1, player=None, subtraction=None):
+    """
+    Train a `QTableNimAI` by playing `n` games against itself, starting
+    from `initial` piles with moves limited to `subtraction`, if given.
+
+    If `player` is given, for instance one loaded from a checkpoint,
+    continue training it instead of starting from scratch.
+    """
+    if player is None:
+        player = QTableNimAI(initial, subtraction=subtraction)
+    player.self_play(n, batch)
+    return player
+
+
+def exponential_decay(start, rate, minimum=0.0):
+    """
+    Return a schedule, a function from the number of games trained to a
+    value, that starts at `start` and is multiplied by `rate` every game,
+    never going below `minimum`.
+    """
+    return lambda games: max(minimum, start * rate ** games)
+
+
+def linear_decay(start, end, games):
+    """
+    Return a schedule that moves linearly from `start` to `end` over the
+    first `games` games, then stays at `end`.
+    """
+    return lambda played: start + (end - start) * min(played / games, 1.0)
+
+
+def win_rate(player, games, opponent=None):
+    """
+    Return the fraction of `games` games that `player`, moving greedily,
+    wins against `opponent`, a function from piles to an action `(i, j)`,
+    or a uniformly random player if `opponent` is None. The player moves
+    first in every other game.
+    """
+    wins = 0
+    for game in range(games):
+        state = player.start
+        turn = game % 2
+        while not player.terminal[state]:
+            if turn == 0:
+                action = player.choose_index(state, epsilon=False)
+            elif opponent is None:
+                legal = player.legal[state]
+                action = int(legal[player.rng.integers(len(legal))])
+            else:
+                action = player.action_index(opponent(player.decode(state)))
+            state = int(player.next_state[state, action])
+            turn = 1 - turn
+
+        # The player left without a move wins
+        wins += turn == 0
+    return wins / games if games else 0.0
+
+
+def train_converged(n, initial=[1, 3, 5, 7],
+                    alpha=exponential_decay(0.5, 0.99995),
+                    epsilon=exponential_decay(0.1, 0.99995), window=1000,
+                    tolerance=1e-3, patience=3, eval_games=200,
+                    opponent=None, batch=1, player=None, subtraction=None,
+                    metrics=None):
+    """
+    Train a `QTableNimAI` by self-play in windows of `window` games, for at
+    most `n` games, stopping early once the Q-values have converged.
+
+    `alpha` and `epsilon` are either numbers or schedules, functions from
+    the number of games trained to a value (see `exponential_decay` and
+    `linear_decay`), looked up at the start of each window. Both decay by
+    default: with a constant learning rate, Q-values keep moving by about
+    `alpha` on every update and training never counts as converged.
+
+    After each window a dict of metrics is recorded: the largest change to
+    any Q-value, the number of states whose greedy action changed, and the
+    greedy policy's win rate over `eval_games` games against `opponent`
+    (see `win_rate`). Training stops when the largest change has been below
+    `tolerance` with no policy changes for `patience` windows in a row.
+
+    If `metrics` is a file, each window's metrics are written to it as a
+    line of JSON. Return the player and the list of metrics.
+    """
+    if player is None:
+        player = QTableNimAI(initial, subtraction=subtraction)
+    legal = player.next_state >= 0
+    live = np.flatnonzero(~player.terminal)
+    delta = np.zeros_like(player.q)
+    policy = player.q.argmax(axis=1)
+    history = []
+    stable = 0
+    played = 0
+    start = time.perf_counter()
+
+    while played < n and stable < patience:
+        player.alpha = alpha(player.games) if callable(alpha) else alpha
+        player.epsilon = (
+            epsilon(player.games) if callable(epsilon) else epsilon
+        )
+        before = player.q.copy()
+        games = min(window, n - played)
+        player.self_play(games, batch)
+        played += games
+
+        np.subtract(player.q, before, out=delta, where=legal)
+        max_delta = float(np.abs(delta).max())
+        # Near-ties between actions flip often and change nothing, so a
+        # state's policy only counts as changed if its new greedy action
+        # beats the old one by at least `tolerance`
+        new_policy = player.q.argmax(axis=1)
+        gain = (
+            player.q[live, new_policy[live]] - player.q[live, policy[live]]
+        )
+        changes = int((gain >= tolerance).sum())
+        policy = new_policy
+
+        stable = stable + 1 if max_delta < tolerance and not changes else 0
+        record = {
+            "games": player.games,
+            "alpha": player.alpha,
+            "epsilon": player.epsilon,
+            "max_delta": max_delta,
+            "policy_changes": changes,
+            "win_rate": win_rate(player, eval_games, opponent),
+            "time": time.perf_counter() - start,
+        }
+        history.append(record)
+        if metrics is not None:
+            metrics.write(json.dumps(record) + "\n")
+            metrics.flush()
+
+    return player, history
+
+
+def play_round(args):
+    """
+    Worker for `train_parallel`: starting from Q-values `q`, play `games`
+    games of self-play seeded with `seed`, and return the new Q-values
+    and the number of updates made to each pair.
+    """
+    initial, alpha, epsilon, subtraction, q, games, seed, batch = args
+    player = QTableNimAI(initial, alpha, epsilon, subtraction)
+    player.q = q
+    player.seed(seed)
+    player.self_play(games, batch)
+    return player.q, player.visits
+
+
+def merge(q, results):
+    """
+    Merge the Q-values learned by several workers from the same starting
+    Q-values `q`: each pair moves by the average of the workers' changes to
+    it, weighted by how often each worker updated it.
+    """
+    change = np.zeros_like(q)
+    visits = np.zeros(q.shape, dtype=np.int64)
+    legal = np.isfinite(q)
+    delta = np.zeros_like(q)
+    for worker_q, worker_visits in results:
+        np.subtract(worker_q, q, out=delta, where=legal)
+        change += worker_visits * delta
+        visits += worker_visits
+    merged = q.copy()
+    updated = visits > 0
+    merged[updated] += change[updated] / visits[updated]
+    return merged
+
+
+def train_parallel(n, initial=[1, 3, 5, 7], workers=None, sync=1000,
+                   batch=1, seed=0, progress=None, alpha=0.5, epsilon=0.1,
+                   player=None, subtraction=None):
+    """
+    Train a `QTableNimAI` on `n` games of self-play spread over a pool of
+    `workers` processes, each with its own random seed.
+
+    Every round, each worker plays `sync` games from the current Q-values,
+    then the workers' Q-tables are merged (see `merge`). No output is
+    produced except, if `progress` is set, a line with the games played
+    and games per second whenever another `progress` games are done.
+
+    If `player` is given, continue training it; its piles, subtraction
+    set and hyperparameters are used instead of the arguments.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    if player is None:
+        player = QTableNimAI(initial, alpha, epsilon, subtraction)
+    initial, alpha, epsilon = player.initial, player.alpha, player.epsilon
+    subtraction = player.subtraction
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    played = 0
+    reported = 0
+
+    with multiprocessing.Pool(workers) as pool:
+        while played < n:
+            games = [
+                min(sync, max(n - played - k * sync, 0))
+                for k in range(workers)
+            ]
+            tasks = [
+                (initial, alpha, epsilon, subtraction, player.q, count,
+                 int(rng.integers(2 ** 63)), batch)
+                for count in games if count
+            ]
+            results = pool.map(play_round, tasks)
+            player.q = merge(player.q, results)
+            for worker_q, worker_visits in results:
+                player.visits += worker_visits
+            played += sum(games)
+            player.games += sum(games)
+
+            if progress and played - reported >= progress:
+                reported = played
+                rate = played / (time.perf_counter() - start)
+                print(f"Trained {played} games ({rate:.0f} games/s)")
+
+    return player
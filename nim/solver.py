@@ -0,0 +1,106 @@
+import functools
+
+from nim import Nim
+
+
+def grundy(pile, subtraction=None):
+    """
+    Return the Grundy value of a single pile of `pile` objects under normal
+    play, where moves remove any count in `subtraction`, or any count at all
+    if `subtraction` is None.
+    """
+    if subtraction is None:
+        return pile
+    return pile_grundy(pile, frozenset(subtraction))
+
+
+@functools.lru_cache(maxsize=None)
+def pile_grundy(pile, subtraction):
+    """Memoized `grundy` for a pile under a frozenset `subtraction`."""
+    options = {
+        pile_grundy(pile - count, subtraction)
+        for count in subtraction if count <= pile
+    }
+    value = 0
+    while value in options:
+        value += 1
+    return value
+
+
+def nim_sum(piles, subtraction=None):
+    """Return the exclusive or of the Grundy values of `piles`."""
+    total = 0
+    for pile in piles:
+        total ^= grundy(pile, subtraction)
+    return total
+
+
+def winning(piles, subtraction=None, misere=True):
+    """
+    Return True if the player to move from `piles` wins with perfect play.
+
+    `Nim` is played misère, the player who takes the last object losing,
+    so that is the default; with `misere` False, the last player to move
+    wins instead and the nim-sum decides the game exactly. Misère ordinary
+    Nim follows the nim-sum too unless every pile holds at most one object;
+    misère subtraction games are solved by memoized search.
+    """
+    if not misere:
+        return nim_sum(piles, subtraction) != 0
+    if subtraction is None:
+        if any(pile > 1 for pile in piles):
+            return nim_sum(piles) != 0
+        return sum(piles) % 2 == 0
+    return misere_winning(tuple(sorted(piles)), frozenset(subtraction))
+
+
+@functools.lru_cache(maxsize=None)
+def misere_winning(piles, subtraction):
+    """
+    Memoized misère `winning` for sorted `piles` under a frozenset
+    `subtraction`. The player with no move wins, as the other player made
+    the last move.
+    """
+    moved = False
+    for i, pile in enumerate(piles):
+        for count in subtraction:
+            if count > pile:
+                continue
+            moved = True
+            child = piles[:i] + (pile - count,) + piles[i + 1:]
+            if not misere_winning(tuple(sorted(child)), subtraction):
+                return True
+    return not moved
+
+
+def optimal_actions(piles, subtraction=None, misere=True):
+    """
+    Return the set of available actions `(i, j)` from `piles` that keep a
+    win for the player to move. If the position is lost, every available
+    action is returned, as none does better than another.
+    """
+    actions = Nim.available_actions(piles, subtraction)
+    best = set()
+    for i, j in actions:
+        child = list(piles)
+        child[i] -= j
+        if not winning(child, subtraction, misere):
+            best.add((i, j))
+    return best or actions
+
+
+def reachable_states(initial=[1, 3, 5, 7], subtraction=None):
+    """
+    Return the set of pile tuples reachable from `initial` piles, including
+    `initial` itself.
+    """
+    seen = {tuple(initial)}
+    frontier = [tuple(initial)]
+    while frontier:
+        piles = frontier.pop()
+        for i, j in Nim.available_actions(piles, subtraction):
+            child = piles[:i] + (piles[i] - j,) + piles[i + 1:]
+            if child not in seen:
+                seen.add(child)
+                frontier.append(child)
+    return seen
@@ -0,0 +1,15 @@
+from nim import train
+
+
+def test_train_one_move_game():
+    for initial, subtraction in [([1], None), ([3], {3})]:
+        player = train(20, progress=0, initial=initial,
+                       subtraction=subtraction)
+        (state, action), = player.q
+        assert state == tuple(initial)
+        assert player.q[state, action] < 0
+
+
+def test_train_no_legal_move():
+    player = train(20, progress=0, initial=[2], subtraction={3})
+    assert player.q == {}
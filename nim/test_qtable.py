@@ -0,0 +1,38 @@
+import numpy as np
+
+from qtable import QTableNimAI, train_converged
+
+
+def check_one_move_game(initial, subtraction=None, batch=1):
+    """Train on a game whose first move ends it and check the updates."""
+    player = QTableNimAI(initial, subtraction=subtraction)
+    player.self_play(50, batch)
+    legal = player.legal[player.start]
+
+    # The only move loses; no other row is touched
+    assert (player.q[player.start, legal] < 0).all()
+    assert player.visits.sum() == player.visits[player.start].sum() == 50
+    others = np.ones(player.num_states, dtype=bool)
+    others[player.start] = False
+    assert (player.q[others][np.isfinite(player.q[others])] == 0).all()
+
+
+def test_one_move_game():
+    check_one_move_game([1])
+
+
+def test_one_move_game_subtraction():
+    check_one_move_game([3], subtraction={3})
+
+
+def test_one_move_game_batch():
+    check_one_move_game([1], batch=8)
+    check_one_move_game([3], subtraction={3}, batch=8)
+
+
+def test_train_converged_defaults_stop_early():
+    n = 300000
+    player, history = train_converged(n, [1, 2, 3], eval_games=10)
+    assert player.games < n
+    assert history[-1]["max_delta"] < 1e-3
+    assert history[-1]["policy_changes"] == 0
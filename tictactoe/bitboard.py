@@ -0,0 +1,213 @@
+"""
+Tic Tac Toe on bitboards
+
+A board is a pair of 9-bit integers `(x, o)` with bit 3 * i + j set where
+X or O has played on cell (i, j).
+"""
+
+import math
+
+from tictactoe import X, O, EMPTY, LINES, MOVE_ORDER, SYMMETRIES
+
+FULL = (1 << 9) - 1
+
+# Bit masks of the winning lines
+WIN_MASKS = [sum(1 << cell for cell in line) for line in LINES]
+
+# For each symmetry, the image of every 9-bit mask under it
+PERMUTATIONS = [
+    [
+        sum(1 << k for k, cell in enumerate(symmetry) if mask >> cell & 1)
+        for mask in range(1 << 9)
+    ]
+    for symmetry in SYMMETRIES
+]
+
+# Transposition table shared by all searches, mapping canonical
+# (mover, other) mask pairs to (value, kind) pairs, with values from the
+# point of view of the player to move
+EXACT = 0
+LOWER = 1
+UPPER = 2
+transpositions = dict()
+
+# Number of positions visited by `negamax`, for benchmarking
+stats = {"nodes": 0}
+
+
+def from_board(board):
+    """Returns the bitboard `(x, o)` of a board in list format."""
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """Returns the board in list format of bitboard `(x, o)`."""
+    return [
+        [
+            X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+            else EMPTY
+            for j in range(3)
+        ]
+        for i in range(3)
+    ]
+
+
+def player(x, o):
+    """Returns player who has the next turn, or None if the game is over."""
+    if terminal(x, o):
+        return None
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(x, o):
+    """Returns set of all possible actions (i, j) available on the board."""
+    empty = FULL & ~(x | o)
+    return {divmod(cell, 3) for cell in range(9) if empty >> cell & 1}
+
+
+def result(x, o, action):
+    """Returns the bitboard that results from making move (i, j)."""
+    i, j = action
+    bit = 1 << (3 * i + j)
+    if terminal(x, o):
+        raise ValueError("Game Over")
+    elif (x | o) & bit:
+        raise ValueError("Invalid Action")
+    elif x.bit_count() == o.bit_count():
+        return x | bit, o
+    else:
+        return x, o | bit
+
+
+def wins(mask):
+    """Returns True if `mask` covers a winning line."""
+    for line in WIN_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def winner(x, o):
+    """Returns the winner of the game, if there is one."""
+    if wins(x):
+        return X
+    elif wins(o):
+        return O
+    return None
+
+
+def terminal(x, o):
+    """Returns True if game is over, False otherwise."""
+    return (x | o) == FULL or wins(x) or wins(o)
+
+
+def utility(x, o):
+    """Returns 1 if X has won the game, -1 if O has won, 0 otherwise."""
+    if wins(x):
+        return 1
+    elif wins(o):
+        return -1
+    return 0
+
+
+def canonical(mover, other):
+    """
+    Returns a key shared by a position and its images under the 8
+    symmetries of the board.
+    """
+    return min(
+        permutation[mover] << 9 | permutation[other]
+        for permutation in PERMUTATIONS
+    )
+
+
+def negamax(mover, other, alpha, beta):
+    """
+    Returns the value of the position for the player to move, whose cells
+    are `mover`: 1 for a win, -1 for a loss, 0 for a draw. As in
+    `tictactoe.alphabeta`, the value is exact only if it lies strictly
+    between `alpha` and `beta`.
+    """
+    stats["nodes"] += 1
+    if wins(other):
+        return -1
+    empty = FULL & ~(mover | other)
+    if not empty:
+        return 0
+
+    key = canonical(mover, other)
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, kind = entry
+        if kind == EXACT:
+            return value
+        elif kind == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    window = (alpha, beta)
+    best = -math.inf
+    for cell in MOVE_ORDER:
+        bit = 1 << cell
+        if not empty & bit:
+            continue
+        value = -negamax(other, mover | bit, -beta, -alpha)
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+
+    if best <= window[0]:
+        transpositions[key] = (best, UPPER)
+    elif best >= window[1]:
+        transpositions[key] = (best, LOWER)
+    else:
+        transpositions[key] = (best, EXACT)
+    return best
+
+
+def best_move(x, o):
+    """
+    Returns the optimal action (i, j) for the player to move on bitboard
+    `(x, o)` and its value for that player, or (None, value) if the game
+    is over.
+    """
+    if x.bit_count() == o.bit_count():
+        mover, other = x, o
+    else:
+        mover, other = o, x
+    if terminal(x, o):
+        return None, -1 if wins(other) else 0
+
+    empty = FULL & ~(x | o)
+    alpha = -math.inf
+    move = None
+    for cell in MOVE_ORDER:
+        bit = 1 << cell
+        if not empty & bit:
+            continue
+        value = -negamax(other, mover | bit, -math.inf, -alpha)
+        if value > alpha:
+            alpha = value
+            move = cell
+    return divmod(move, 3), alpha
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on a board in list
+    format, as `tictactoe.minimax` does, searching on bitboards.
+    """
+    return best_move(*from_board(board))[0]
@@ -0,0 +1,58 @@
+import sys
+
+import bitboard
+from tictactoe import MISSING, NO_MOVE, TABLE_FILE
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python build_table.py [table.bin]")
+    filename = sys.argv[1] if len(sys.argv) == 2 else TABLE_FILE
+
+    table = build_table()
+    with open(filename, "wb") as f:
+        f.write(table)
+    positions = sum(1 for entry in table if entry != MISSING)
+    print(f"Wrote {positions} positions to {filename}")
+
+
+def index(x, o):
+    """Returns the base-3 encoding of bitboard `(x, o)`."""
+    return sum(
+        (1 if x >> k & 1 else 2 if o >> k & 1 else 0) * 3 ** k
+        for k in range(9)
+    )
+
+
+def build_table():
+    """
+    Solve every position reachable from the empty board, and return the
+    perfect-play table described in `tictactoe`.
+    """
+    table = bytearray([MISSING]) * 3 ** 9
+    frontier = [(0, 0)]
+    while frontier:
+        x, o = frontier.pop()
+        key = index(x, o)
+        if table[key] != MISSING:
+            continue
+
+        if bitboard.terminal(x, o):
+            table[key] = 3 * NO_MOVE + bitboard.utility(x, o) + 1
+            continue
+
+        # Values are for the player to move; the table holds utilities
+        action, value = bitboard.best_move(x, o)
+        if bitboard.player(x, o) == bitboard.O:
+            value = -value
+        i, j = action
+        table[key] = 3 * (3 * i + j) + value + 1
+        for action in bitboard.actions(x, o):
+            frontier.append(bitboard.result(x, o, action))
+    return bytes(table)
+
+
+if __name__ == "__main__":
+    main()
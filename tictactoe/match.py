@@ -0,0 +1,303 @@
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+from mnk import WIN, Engine, MNKGame, SearchTimeout, count
+
+# Players that can be matched; the tictactoe engines only play 3x3 boards
+PLAYERS = [
+    "random", "table", "search", "bitboard", "mnk", "parallel",
+    "parallel-search",
+]
+
+# Per-move time budget in seconds for the time-bounded players
+BUDGET = 0.1
+
+# Random moves played at the start of each game, so that deterministic
+# players do not replay the same game
+OPENING = 1
+
+
+def main():
+
+    # Check usage
+    if (len(sys.argv) not in [4, 7]
+            or sys.argv[2] not in PLAYERS or sys.argv[3] not in PLAYERS):
+        sys.exit("Usage: python match.py games player player [m n k]\n"
+                 f"Players: {', '.join(PLAYERS)}")
+    games = int(sys.argv[1])
+    names = sys.argv[2:4]
+    m, n, k = (int(arg) for arg in sys.argv[4:7]) if len(sys.argv) == 7 \
+        else (3, 3, 3)
+    game = MNKGame(m, n, k)
+
+    parallel = {"parallel", "parallel-search"} & set(names)
+    pool = multiprocessing.Pool() if parallel else None
+    try:
+        players = [
+            make_player(name, game, seed, pool)
+            for seed, name in enumerate(names)
+        ]
+        stats = play_match(game, players, games)
+    except ValueError as e:
+        sys.exit(str(e))
+    finally:
+        if pool is not None:
+            pool.close()
+
+    print(f"Board: {m}x{n}, {k} in a row; {games} games")
+    print(f"Results: {names[0]} {stats['wins'][0]} wins, "
+          f"{names[1]} {stats['wins'][1]} wins, {stats['draws']} draws")
+    print(f"{'player':>15} {'moves':>6} {'nodes':>10} {'nodes/s':>10} "
+          f"{'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for name, latencies, nodes in zip(names, stats["latencies"],
+                                      stats["nodes"]):
+        elapsed = sum(latencies)
+        rate = nodes / elapsed if elapsed else 0.0
+        print(f"{name:>15} {len(latencies):>6} {nodes:>10} {rate:>10.0f} "
+              + " ".join(
+                  f"{1e3 * percentile(latencies, fraction):>7.2f}ms"
+                  for fraction in (0.5, 0.9, 0.99, 1.0)
+              ))
+
+
+class RandomPlayer():
+    """Player choosing uniformly among the available actions."""
+
+    def __init__(self, game, seed):
+        self.game = game
+        self.rng = random.Random(seed)
+        self.nodes = 0
+
+    def choose_action(self, board):
+        return self.rng.choice(sorted(self.game.actions(board)))
+
+
+class FunctionPlayer():
+    """
+    Player wrapping a search function of a 3x3 board, such as
+    `tictactoe.minimax`, counting nodes from its module's `stats`.
+    """
+
+    def __init__(self, function, stats):
+        self.function = function
+        self.stats = stats
+        self.nodes = 0
+
+    def choose_action(self, board):
+        before = self.stats["nodes"]
+        action = self.function(board)
+        self.nodes += self.stats["nodes"] - before
+        return action
+
+
+class EnginePlayer():
+    """Player searching with an `mnk.Engine`."""
+
+    def __init__(self, game, budget):
+        self.engine = Engine(game, budget=budget)
+        self.nodes = 0
+
+    def choose_action(self, board):
+        action = self.engine.choose_action(board)
+        self.nodes += self.engine.stats["nodes"]
+        return action
+
+
+class ParallelPlayer():
+    """
+    Player splitting an `mnk.Engine` search at the root: at each depth of
+    iterative deepening, every candidate move is searched to that depth in
+    a process of `pool`. Only depths that every move completed within
+    `budget` seconds are used, so that moves are always compared on
+    values from the same depth.
+    """
+
+    def __init__(self, game, budget, pool):
+        self.game = game
+        self.engine = Engine(game)
+        self.budget = budget
+        self.pool = pool
+        self.nodes = 0
+
+    def choose_action(self, board):
+        start = time.perf_counter()
+        game = self.game
+        moves = self.engine.candidates(board)
+        best = moves[0]
+        limit = game.m * game.n - count(board, ttt.X) - count(board, ttt.O)
+
+        # Workers share the deadline, on a clock common to all processes
+        deadline = None
+        if self.budget is not None:
+            deadline = time.time() + self.budget - (time.perf_counter()
+                                                    - start)
+
+        for depth in range(limit):
+            if deadline is not None and time.time() >= deadline:
+                break
+            tasks = [
+                (game.m, game.n, game.k, board, move, depth, deadline)
+                for move in moves
+            ]
+            results = self.pool.map(search_move, tasks)
+            self.nodes += sum(nodes for value, nodes in results)
+            if any(value is None for value, nodes in results):
+                break
+
+            values = [value for value, nodes in results]
+            value = max(values)
+            best = moves[values.index(value)]
+            moves.remove(best)
+            moves.insert(0, best)
+
+            # Stop once the result is known for certain
+            if abs(value) >= WIN - limit:
+                break
+        return best
+
+
+def search_move(args):
+    """
+    Worker for `ParallelPlayer`: return the value to the player to move of
+    playing `move` on `board`, searching `depth` moves further, or None if
+    that is not done by `deadline`, a `time.time()` value, and the number
+    of nodes searched.
+    """
+    m, n, k, board, move, depth, deadline = args
+    engine = Engine(MNKGame(m, n, k))
+    board = [row.copy() for row in board]
+    turn = ttt.X if count(board, ttt.X) == count(board, ttt.O) else ttt.O
+    other = ttt.O if turn == ttt.X else ttt.X
+    i, j = move
+    board[i][j] = turn
+    if deadline is not None:
+        engine.deadline = time.perf_counter() + (deadline - time.time())
+    try:
+        value = -engine.negamax(board, other, move, depth, 1,
+                                -math.inf, math.inf)
+    except SearchTimeout:
+        value = None
+    return value, engine.stats["nodes"]
+
+
+class RootSplitPlayer():
+    """
+    Player splitting `tictactoe.alphabeta` at the root: every move is
+    searched exactly in a process of `pool`, whose transposition table
+    persists between moves, and the best is chosen as `tictactoe.search`
+    would.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.nodes = 0
+
+    def choose_action(self, board):
+        cells = [cell for row in board for cell in row]
+        turn = ttt.player(board)
+        moves = [move for move in ttt.MOVE_ORDER if cells[move] is ttt.EMPTY]
+        children = []
+        for move in moves:
+            child = cells.copy()
+            child[move] = turn
+            children.append(child)
+        results = self.pool.map(search_child, children)
+        self.nodes += sum(nodes for value, nodes in results)
+
+        values = [value for value, nodes in results]
+        value = max(values) if turn == ttt.X else min(values)
+        return divmod(moves[values.index(value)], 3)
+
+
+def search_child(cells):
+    """
+    Worker for `RootSplitPlayer`: return the exact value of the board
+    given as a list of 9 cells, and the number of nodes searched.
+    """
+    before = ttt.stats["nodes"]
+    value = ttt.alphabeta(cells, -math.inf, math.inf)
+    return value, ttt.stats["nodes"] - before
+
+
+def make_player(name, game, seed=0, pool=None, budget=BUDGET):
+    """
+    Return a player object with a `choose_action(board)` method and a
+    running count of `nodes` searched, given its name from PLAYERS.
+    """
+    if name == "random":
+        return RandomPlayer(game, seed)
+    elif name == "mnk":
+        return EnginePlayer(game, budget)
+    elif name == "parallel":
+        return ParallelPlayer(game, budget, pool)
+    elif (game.m, game.n, game.k) != (3, 3, 3):
+        raise ValueError(f"Player {name} only plays 3x3 tic-tac-toe")
+    elif name == "table":
+        return FunctionPlayer(ttt.minimax, ttt.stats)
+    elif name == "search":
+        ttt.transpositions.clear()
+        return FunctionPlayer(ttt.search, ttt.stats)
+    elif name == "parallel-search":
+        return RootSplitPlayer(pool)
+    elif name == "bitboard":
+        bitboard.transpositions.clear()
+        return FunctionPlayer(bitboard.minimax, bitboard.stats)
+    raise ValueError(f"Unknown player {name}")
+
+
+def play_match(game, players, games, seed=0, opening=OPENING):
+    """
+    Play `games` games between two players, who take turns playing X.
+    Each game starts with `opening` random moves, seeded from `seed`.
+
+    Return a dict with the wins of each player, the number of draws, each
+    player's per-move latencies in seconds, and the nodes each searched.
+    """
+    rng = random.Random(seed)
+    stats = {
+        "wins": [0, 0],
+        "draws": 0,
+        "latencies": [[], []],
+        "nodes": [0, 0],
+    }
+    for number in range(games):
+        order = [0, 1] if number % 2 == 0 else [1, 0]
+        board = game.initial_state()
+        for _ in range(opening):
+            if game.terminal(board):
+                break
+            action = rng.choice(sorted(game.actions(board)))
+            board = game.result(board, action)
+
+        while not game.terminal(board):
+            index = order[0] if game.player(board) == ttt.X else order[1]
+            start = time.perf_counter()
+            action = players[index].choose_action(board)
+            stats["latencies"][index].append(time.perf_counter() - start)
+            board = game.result(board, action)
+
+        win = game.winner(board)
+        if win is None:
+            stats["draws"] += 1
+        else:
+            stats["wins"][order[0] if win == ttt.X else order[1]] += 1
+
+    stats["nodes"] = [player.nodes for player in players]
+    return stats
+
+
+def percentile(values, fraction):
+    """Return the value below which `fraction` of `values` lie."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+m,n,k Game Player
+
+Boards are m rows by n columns in the same list format as `tictactoe`,
+and a player wins with k of their marks in a row, column or diagonal.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position, less the number of moves taken to reach it, so
+# that quicker wins score higher; evaluations must stay well below it
+WIN = 10 ** 9
+
+# Directions along which k in a row can be formed
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class SearchTimeout(Exception):
+    """Raised when a search runs out of time."""
+
+
+class MNKGame():
+
+    def __init__(self, m=3, n=3, k=3):
+        """
+        Initialize a game on an `m` by `n` board won by `k` in a row, and
+        list every line of `k` cells on which it can be won.
+        """
+        self.m = m
+        self.n = n
+        self.k = k
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    line = [(i + t * di, j + t * dj) for t in range(k)]
+                    if all(0 <= a < m and 0 <= b < n for a, b in line):
+                        self.lines.append(line)
+
+    def initial_state(self):
+        """Returns starting state of the board."""
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """Returns player who has the next turn, or None if game is over."""
+        if self.terminal(board):
+            return None
+        return X if count(board, X) == count(board, O) else O
+
+    def actions(self, board):
+        """Returns set of all possible actions (i, j) available."""
+        return {
+            (i, j)
+            for i in range(self.m)
+            for j in range(self.n)
+            if board[i][j] == EMPTY
+        }
+
+    def result(self, board, action):
+        """Returns the board that results from making move (i, j)."""
+        if self.terminal(board):
+            raise ValueError("Game Over")
+        elif action not in self.actions(board):
+            raise ValueError("Invalid Action")
+        i, j = action
+        result_board = [row.copy() for row in board]
+        result_board[i][j] = self.player(board)
+        return result_board
+
+    def winner(self, board):
+        """Returns the winner of the game, if there is one."""
+        for line in self.lines:
+            i, j = line[0]
+            mark = board[i][j]
+            if mark is not EMPTY and all(board[a][b] == mark
+                                         for a, b in line):
+                return mark
+        return None
+
+    def terminal(self, board):
+        """Returns True if game is over, False otherwise."""
+        if self.winner(board) is not None:
+            return True
+        return all(cell != EMPTY for row in board for cell in row)
+
+    def utility(self, board):
+        """Returns 1 if X has won the game, -1 if O has won, 0 otherwise."""
+        win = self.winner(board)
+        return 1 if win == X else -1 if win == O else 0
+
+    def wins_at(self, board, i, j):
+        """Returns True if the mark on (i, j) is part of k in a row."""
+        mark = board[i][j]
+        for di, dj in DIRECTIONS:
+            run = 1
+            for sign in (1, -1):
+                a, b = i + sign * di, j + sign * dj
+                while (0 <= a < self.m and 0 <= b < self.n
+                       and board[a][b] == mark):
+                    run += 1
+                    a, b = a + sign * di, b + sign * dj
+            if run >= self.k:
+                return True
+        return False
+
+
+def count(board, mark):
+    """Returns the number of cells on the board holding `mark`."""
+    return sum(row.count(mark) for row in board)
+
+
+def line_evaluation(game, board):
+    """
+    Evaluation function scoring a board from X's point of view: every line
+    of k cells holding marks of only one player is worth 10 to the power
+    of the number of marks on it, to that player.
+    """
+    score = 0
+    for line in game.lines:
+        xs = os = 0
+        for i, j in line:
+            cell = board[i][j]
+            if cell == X:
+                xs += 1
+            elif cell == O:
+                os += 1
+        if not os and xs:
+            score += 10 ** xs
+        elif not xs and os:
+            score -= 10 ** os
+    return score
+
+
+class Engine():
+
+    def __init__(self, game, evaluate=line_evaluation, budget=1.0,
+                 max_depth=None, radius=2):
+        """
+        Initialize an iterative deepening alpha-beta search for `game`.
+
+        `evaluate(game, board)` scores boards where the depth limit is
+        reached, from X's point of view. `budget` is the wall-clock time
+        allowed per move in seconds, or None for no limit, and `max_depth`
+        an optional limit on the search depth. Only empty cells within
+        `radius` of a mark are searched.
+        """
+        self.game = game
+        self.evaluate = evaluate
+        self.budget = budget
+        self.max_depth = max_depth
+        self.radius = radius
+        self.deadline = None
+        self.stats = {"nodes": 0, "depth": 0, "time": 0.0}
+
+    def candidates(self, board):
+        """
+        Returns the empty cells within `self.radius` of a mark, or the
+        center if the board is empty, nearest the center first.
+        """
+        m, n, r = self.game.m, self.game.n, self.radius
+        cells = set()
+        for i in range(m):
+            for j in range(n):
+                if board[i][j] == EMPTY:
+                    continue
+                for a in range(max(i - r, 0), min(i + r + 1, m)):
+                    for b in range(max(j - r, 0), min(j + r + 1, n)):
+                        if board[a][b] == EMPTY:
+                            cells.add((a, b))
+        if not cells and board[m // 2][n // 2] == EMPTY:
+            cells.add((m // 2, n // 2))
+        return sorted(
+            cells,
+            key=lambda cell: (abs(2 * cell[0] - m + 1)
+                              + abs(2 * cell[1] - n + 1), cell)
+        )
+
+    def choose_action(self, board):
+        """
+        Returns the best action found for the current player within the
+        time budget, or None if the game is over.
+
+        The search is repeated one move deeper at a time, each iteration
+        trying the previous iteration's best move first. When time runs out
+        the best move of the last completed iteration is returned.
+        """
+        start = time.perf_counter()
+        self.deadline = None if self.budget is None else start + self.budget
+        self.stats = {"nodes": 0, "depth": 0, "time": 0.0}
+        if self.game.terminal(board):
+            return None
+
+        board = [row.copy() for row in board]
+        turn = X if count(board, X) == count(board, O) else O
+        moves = self.candidates(board)
+        best = moves[0]
+        empty = self.game.m * self.game.n - count(board, X) - count(board, O)
+        limit = empty if self.max_depth is None else min(self.max_depth,
+                                                         empty)
+
+        for depth in range(1, limit + 1):
+            try:
+                value, move = self.search_root(board, turn, moves, depth)
+            except SearchTimeout:
+                break
+            best = move
+            moves.remove(move)
+            moves.insert(0, move)
+            self.stats["depth"] = depth
+
+            # Stop once the result is known for certain
+            if abs(value) >= WIN - limit:
+                break
+
+        self.stats["time"] = time.perf_counter() - start
+        return best
+
+    def search_root(self, board, turn, moves, depth):
+        """Returns the value and best move of a search to `depth`."""
+        other = O if turn == X else X
+        alpha = -math.inf
+        best = None
+        for i, j in moves:
+            board[i][j] = turn
+            value = -self.negamax(board, other, (i, j), depth - 1, 1,
+                                  -math.inf, -alpha)
+            board[i][j] = EMPTY
+            if best is None or value > alpha:
+                alpha = value
+                best = (i, j)
+        return alpha, best
+
+    def negamax(self, board, turn, last, depth, ply, alpha, beta):
+        """
+        Returns the value of the board for `turn`, the player to move,
+        after the other player moved on `last`, searching `depth` moves
+        ahead with alpha-beta pruning.
+        """
+        self.stats["nodes"] += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        if self.game.wins_at(board, *last):
+            return -(WIN - ply)
+        moves = self.candidates(board)
+        if not moves:
+            return 0
+        if depth == 0:
+            value = self.evaluate(self.game, board)
+            return value if turn == X else -value
+
+        other = O if turn == X else X
+        best = -math.inf
+        for i, j in moves:
+            board[i][j] = turn
+            value = -self.negamax(board, other, (i, j), depth - 1, ply + 1,
+                                  -beta, -alpha)
+            board[i][j] = EMPTY
+            if value > best:
+                best = value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        return best
@@ -0,0 +1,46 @@
+import bitboard
+import tictactoe as ttt
+from build_table import build_table
+
+
+def reachable_boards():
+    """Return every board reachable from the empty board."""
+    seen = dict()
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key = tuple(cell for row in board for cell in row)
+        if key in seen:
+            continue
+        seen[key] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                frontier.append(ttt.result(board, action))
+    return list(seen.values())
+
+
+def test_table_file_is_current():
+    with open(ttt.TABLE_FILE, "rb") as f:
+        assert build_table() == f.read()
+
+
+def test_table_matches_search():
+    for board in reachable_boards():
+        cells = [cell for row in board for cell in row]
+        action, value = ttt.lookup(cells)
+        if ttt.terminal(board):
+            assert action is None
+            assert value == ttt.utility(board)
+            continue
+
+        # The table's value is the searched value, and its move keeps it
+        move, searched = bitboard.best_move(*bitboard.from_board(board))
+        if ttt.player(board) == ttt.O:
+            searched = -searched
+        assert value == searched
+        assert ttt.minimax(board) == action
+
+        for move in (action, ttt.search(board)):
+            child = ttt.result(board, move)
+            cells = [cell for row in child for cell in row]
+            assert ttt.alphabeta(cells, -2, 2) == value
@@ -3,12 +3,67 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Cells are numbered 3 * i + j. Each winning line is a triple of cells
+LINES = [
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6),
+]
+
+# The 8 symmetries of the board, each a tuple giving for every cell the
+# cell it is taken from
+SYMMETRIES = [
+    tuple(3 * f(i, j)[0] + f(i, j)[1] for i in range(3) for j in range(3))
+    for f in [
+        lambda i, j: (i, j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    ]
+]
+
+# Order in which moves are searched: the center, then corners, then edges,
+# as that is roughly how many lines each cell is part of
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# Base-3 digit of each cell value, for encoding boards as integers
+DIGITS = {EMPTY: 0, X: 1, O: 2}
+
+# Transposition table entry kinds: the stored value is exact, or only a
+# lower or upper bound on the true value
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Transposition table shared by all searches, mapping canonical board
+# encodings to (value, kind) pairs
+transpositions = dict()
+
+# Perfect-play table written by build_table.py: one byte for each of the
+# 3 ** 9 board encodings, holding 3 * move + value + 1 where move is the
+# best cell (NO_MOVE if the game is over) and value the board's utility
+# under optimal play, or MISSING for boards that cannot occur
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "table.bin")
+NO_MOVE = 9
+MISSING = 255
+
+# Contents of TABLE_FILE, loaded on first use; False if there is no table
+table = None
+
+# Number of positions visited by `alphabeta`, for benchmarking
+stats = {"nodes": 0}
+
 
 def initial_state():
     """
@@ -65,7 +120,7 @@ def result(board, action):
         raise ValueError("Invalid Action")
     else:
         player_name = player(board)
-        result_board = copy.deepcopy(board)
+        result_board = [row.copy() for row in board]
         (i, j) = action
         result_board[i][j] = player_name
     return result_board
@@ -75,21 +130,21 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(3):
-
-        if (board[i][0] == board[i][1] == board[i][2] and board[i][0] != None):
-            return board[i][0]
+    cells = [board[i][j] for i in range(3) for j in range(3)]
+    return line_winner(cells)
 
-        elif (board[0][0] == board[1][1] == board[2][2] or (board[0][2] == board[1][1] == board[2][0]) and board[1][1] != None):
-             return board[1][1]
 
-        elif (board[0][i] == board[1][i] == board[2][i] and board[0][i] != None):
-             return board[1][i]
-            
+def line_winner(cells):
+    """
+    Returns the winner of a board given as a list of 9 cells, if there
+    is one.
+    """
+    for a, b, c in LINES:
+        if cells[a] is not EMPTY and cells[a] == cells[b] == cells[c]:
+            return cells[a]
     return None
 
 
-
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
@@ -122,44 +177,146 @@ def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
-    player_name = player(board)
-
     if terminal(board):
         return None
 
-    elif board == initial_state():
-        return (1,1)
-    elif player_name == X:
-        v = float("-inf")
-        selected_action = None
-        for action in actions(board):
-            minValueResult = minValue(result(board, action))
-            if minValueResult > v:
-                v = minValueResult
-                selected_action = action
-    elif player_name == O:
-        v = float("inf")
-        selected_action = None
-        for action in actions(board):
-            maxValueResult = maxValue(result(board, action))
-            if maxValueResult < v:
-                v = maxValueResult
-                selected_action = action
-    return selected_action
-
-
-def maxValue(board):
-    if terminal(board):
-        return utility(board)
-    v = float("-inf")
-    for action in actions(board):
-        v = max(v, minValue(result(board, action)))
-    return v
+    cells = [board[i][j] for i in range(3) for j in range(3)]
+    entry = lookup(cells)
+    if entry is not None:
+        return entry[0]
+    return search(board)
+
 
-def minValue(board):
+def search(board):
+    """
+    Returns the optimal action for the current player on the board,
+    found by alpha-beta search without the perfect-play table.
+    """
     if terminal(board):
-        return utility(board)
-    v = float("inf")
-    for action in actions(board):
-        v = min(v, maxValue(result(board, action)))
-    return v
+        return None
+
+    cells = [board[i][j] for i in range(3) for j in range(3)]
+    turn = player(board)
+    alpha = -math.inf
+    beta = math.inf
+    best_value = None
+    best_move = None
+    for move in MOVE_ORDER:
+        if cells[move] is not EMPTY:
+            continue
+        cells[move] = turn
+        value = alphabeta(cells, alpha, beta)
+        cells[move] = EMPTY
+        if turn == X and (best_value is None or value > best_value):
+            best_value, best_move = value, move
+            alpha = value
+        elif turn == O and (best_value is None or value < best_value):
+            best_value, best_move = value, move
+            beta = value
+    return divmod(best_move, 3)
+
+
+def encode(cells):
+    """
+    Returns the base-3 encoding of the cells of a board, cell k being
+    digit k.
+    """
+    return sum(DIGITS[cell] * 3 ** k for k, cell in enumerate(cells))
+
+
+def canonical(cells):
+    """
+    Returns the smallest base-3 encoding of the cells of a board under
+    its 8 symmetries, so that symmetric boards share one key.
+    """
+    return min(
+        encode([cells[k] for k in symmetry]) for symmetry in SYMMETRIES
+    )
+
+
+def load_table(filename=TABLE_FILE):
+    """
+    Returns the perfect-play table in `filename`, or False if there is
+    none.
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return False
+    if len(data) != 3 ** 9:
+        raise ValueError("Invalid table file")
+    return data
+
+
+def lookup(cells):
+    """
+    Returns the optimal action and the utility under optimal play of a
+    board given as a list of 9 cells, from the perfect-play table, or None
+    if there is no table. The table is loaded the first time it is needed.
+    """
+    global table
+    if table is None:
+        table = load_table()
+    if not table:
+        return None
+    entry = table[encode(cells)]
+    if entry == MISSING:
+        raise ValueError("Invalid board")
+    move, value = divmod(entry, 3)
+    action = None if move == NO_MOVE else divmod(move, 3)
+    return action, value - 1
+
+
+def alphabeta(cells, alpha, beta):
+    """
+    Returns the value of a board given as a list of 9 cells under optimal
+    play: 1 if X wins, -1 if O wins, 0 for a draw. The value is exact if
+    it lies strictly between `alpha` and `beta`; otherwise it is only a
+    bound, as the search is cut off once the value cannot matter.
+    """
+    stats["nodes"] += 1
+    win = line_winner(cells)
+    if win is not None:
+        return 1 if win == X else -1
+    if EMPTY not in cells:
+        return 0
+
+    key = canonical(cells)
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, kind = entry
+        if kind == EXACT:
+            return value
+        elif kind == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    window = (alpha, beta)
+    turn = X if cells.count(X) == cells.count(O) else O
+    best = -math.inf if turn == X else math.inf
+    for move in MOVE_ORDER:
+        if cells[move] is not EMPTY:
+            continue
+        cells[move] = turn
+        value = alphabeta(cells, alpha, beta)
+        cells[move] = EMPTY
+        if turn == X:
+            best = max(best, value)
+            alpha = max(alpha, value)
+        else:
+            best = min(best, value)
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+
+    if best <= window[0]:
+        transpositions[key] = (best, UPPER)
+    elif best >= window[1]:
+        transpositions[key] = (best, LOWER)
+    else:
+        transpositions[key] = (best, EXACT)
+    return best